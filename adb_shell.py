@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Persistent ADB shells for UBTool
+Keeps one long-lived `adb shell` per device and runs commands through it
+"""
+
+import asyncio
+import uuid
+from typing import Dict, Optional, Tuple
+
+
+class ShellError(Exception):
+    """Raised when the persistent shell is unusable; callers fall back to one-shot exec"""
+
+
+class PersistentShell:
+    """A single long-lived `adb -s <id> shell` process"""
+
+    __slots__ = (
+        'adb_path', 'device_id', 'process', 'lock', '_token', '_rc_marker', '_end_marker'
+    )
+
+    def __init__(self, adb_path: str, device_id: str):
+        self.adb_path = adb_path
+        self.device_id = device_id
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.lock = asyncio.Lock()
+        # Markers are printed with printf from two halves, so they never
+        # appear verbatim in the (possibly echoed) command text
+        self._token = uuid.uuid4().hex
+        self._rc_marker = f'__UB_{self._token}_RC '.encode()
+        self._end_marker = f'__UB_{self._token}_END'.encode()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def _wrap(self, command: str) -> bytes:
+        """Wrap a command so stdout, stderr and the exit code can be told apart"""
+        # Subshell keeps `cd`/`export` from leaking between commands and
+        # </dev/null stops the command from eating the rest of our stdin
+        return (
+            f'( {command}\n) </dev/null 2>"$UB_ERR"; '
+            f"printf '%s%s_RC %d\\n' __UB_ {self._token} $?; "
+            f'cat "$UB_ERR" 2>/dev/null; '
+            f"printf '%s%s_END' __UB_ {self._token}\n"
+        ).encode()
+
+    async def start(self, timeout: float = 10):
+        """Spawn the shell and wait until it answers"""
+        self.process = await asyncio.create_subprocess_exec(
+            self.adb_path, '-s', self.device_id, 'shell',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        # adb may allocate a PTY: silence echo and prompts, then pick a
+        # scratch file for stderr
+        setup = (
+            'stty -echo 2>/dev/null; PS1=; PS2=; '
+            'UB_ERR=$(mktemp 2>/dev/null || echo /tmp/.ubtool_err.$$)\n'
+        )
+        self.process.stdin.write(setup.encode())
+        await self._exchange('true', timeout)
+
+    async def _exchange(self, command: str, timeout: float) -> Tuple[str, str, int]:
+        if not self.alive:
+            raise ShellError('shell no activo')
+
+        try:
+            self.process.stdin.write(self._wrap(command))
+            await self.process.stdin.drain()
+            raw = await asyncio.wait_for(self._read_until_end(), timeout=timeout)
+        except (ConnectionError, BrokenPipeError) as e:
+            self.kill()
+            raise ShellError(str(e))
+
+        text = raw.replace(b'\r\n', b'\n')
+        rc_pos = text.rfind(self._rc_marker)
+        if rc_pos < 0:
+            self.kill()
+            raise ShellError('respuesta del shell incompleta')
+
+        stdout = text[:rc_pos]
+        rc_line, _, stderr = text[rc_pos + len(self._rc_marker):].partition(b'\n')
+        try:
+            return_code = int(rc_line.strip() or 0)
+        except ValueError:
+            return_code = -1
+
+        return (
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'),
+            return_code
+        )
+
+    async def _read_until_end(self) -> bytes:
+        buf = bytearray()
+        while True:
+            chunk = await self.process.stdout.read(65536)
+            if not chunk:
+                self.kill()
+                raise ShellError('el shell terminó inesperadamente')
+            # Only rescan the tail that could contain a split marker
+            start = max(0, len(buf) - len(self._end_marker))
+            buf.extend(chunk)
+            pos = buf.find(self._end_marker, start)
+            if pos >= 0:
+                return bytes(buf[:pos])
+
+    async def run(self, command: str, timeout: float = 30) -> Tuple[str, str, int]:
+        """Run a command; on timeout the shell is killed since its state is unknown"""
+        try:
+            return await self._exchange(command, timeout)
+        except asyncio.TimeoutError:
+            self.kill()
+            raise
+
+    def kill(self):
+        """Terminate the adb shell process"""
+        if self.alive:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+
+class ShellPool:
+    """One persistent shell per device"""
+
+    __slots__ = ('adb_path', 'shells')
+
+    def __init__(self, adb_path: str):
+        self.adb_path = adb_path
+        self.shells: Dict[str, PersistentShell] = {}
+
+    async def run(self, device_id: str, command: str, timeout: float = 30) -> Tuple[str, str, int]:
+        """Run a command on the device's persistent shell.
+
+        Raises ShellError when the shell is busy or broken so the caller can
+        fall back to a one-shot `adb shell` instead of queueing.
+        """
+        shell = self.shells.get(device_id)
+        # A shell that is still starting isn't alive yet but holds its lock
+        if shell is None or (not shell.alive and not shell.lock.locked()):
+            shell = PersistentShell(self.adb_path, device_id)
+            self.shells[device_id] = shell
+
+        if shell.lock.locked():
+            raise ShellError('shell ocupado')
+
+        async with shell.lock:
+            if not shell.alive:
+                try:
+                    await shell.start()
+                except (asyncio.TimeoutError, OSError) as e:
+                    shell.kill()
+                    raise ShellError(f'no se pudo iniciar el shell: {e}')
+            return await shell.run(command, timeout)
+
+    def close(self, device_id: str):
+        """Kill the shell of a device (e.g. before a reboot)"""
+        shell = self.shells.pop(device_id, None)
+        if shell:
+            shell.kill()
+
+    def close_all(self):
+        """Kill every persistent shell"""
+        for device_id in list(self.shells.keys()):
+            self.close(device_id)
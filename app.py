@@ -8,6 +8,7 @@ Misión: Dar vida a Ubuntu Touch y ayudar a que el SO crezca y sea mantenido por
 """
 
 import os
+import posixpath
 import subprocess
 import sys
 import asyncio
@@ -15,41 +16,288 @@ import json
 import uuid
 import mimetypes
 import re
-import urllib.parse
 import base64
-from threading import Thread
+import gzip
+import hashlib
+import logging
+import logging.handlers
+import platform
+import queue
+import shlex
+import shutil
+import signal
+import socket
+import tempfile
+import time
+import concurrent.futures
+from functools import lru_cache, partial
 
-from microdot import Microdot
+from microdot import Microdot, Response
 from microdot.jinja import Template
 from microdot.cors import CORS
+from microdot.websocket import with_websocket
+from microdot.multipart import with_form_data
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
 
 # Import terminal manager
 from terminal_manager import TerminalManager
+from adb_shell import ShellPool, ShellError
+import config
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+try:
+    import uvloop
+except Exception:
+    uvloop = None
 
 try:
-    import humanize
+    import orjson
 except Exception:
-    humanize = None
+    orjson = None
 
 app = Microdot()
 CORS(app, allowed_origins="*", allow_credentials=True)
+# Microdot streams file bodies in chunks of this size (default is 1 KiB)
+Response.send_file_buffer_size = 64 * 1024
 
 # Configuration
 DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
+# Microdot's own debug mode prints every request to stdout; keep it opt-in
+# even when DEBUG (verbose logs, template reloading) is on
+SERVER_DEBUG = os.getenv('UBTOOL_SERVER_DEBUG', 'False').lower() == 'true'
 HOST = os.getenv('HOST', '0.0.0.0')
 PORT = int(os.getenv('PORT', 8080))
+SERVER_URL = f'http://{HOST}:{PORT}'
+ADB_MAX_CONCURRENCY = max(1, int(os.getenv('ADB_MAX_CONCURRENCY', 4)))
+ADB_DEVICES_TTL = float(os.getenv('ADB_DEVICES_TTL', 1.5))
+DEVICE_INFO_TTL = float(os.getenv('DEVICE_INFO_TTL', 2.0))
+BLOCKING_POOL_SIZE = max(1, int(os.getenv('BLOCKING_POOL_SIZE', 8)))
+# Set UBTOOL_NO_UVLOOP=true to fall back to the stock asyncio loop
+USE_UVLOOP = os.getenv('UBTOOL_NO_UVLOOP', 'False').lower() != 'true'
+ADB_SERVER_HOST = '127.0.0.1'
+ADB_SERVER_PORT = int(os.getenv('ANDROID_ADB_SERVER_PORT', 5037))
+
+# Logging: handlers only enqueue records; a background listener thread does
+# the actual (possibly blocking) writes to stderr
+logger = logging.getLogger('ubtool')
+logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+log_listener.start()
+
+# Sync handlers (Microdot runs them in the loop's default executor) and the
+# blocking calls left in async handlers share this bounded pool
+blocking_pool = concurrent.futures.ThreadPoolExecutor(
+    max_workers=BLOCKING_POOL_SIZE, thread_name_prefix='ubtool-blocking'
+)
+
+async def run_blocking(func, *args, **kwargs):
+    """Ejecuta una llamada bloqueante en el pool sin frenar el event loop"""
+    return await asyncio.get_running_loop().run_in_executor(
+        blocking_pool, partial(func, *args, **kwargs)
+    )
+
+ADB_PATH_CACHE_FILE = os.path.join(
+    os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'ubtool', 'adb_path.json'
+)
+
+# Templates are compiled once and cached; in DEBUG they are reloaded on change
+JINJA_BYTECODE_DIR = os.path.join(tempfile.gettempdir(), 'ubtool_jinja')
+os.makedirs(JINJA_BYTECODE_DIR, exist_ok=True)
+JINJA_ENV = Environment(
+    loader=FileSystemLoader('templates'),
+    autoescape=select_autoescape(['html']),
+    auto_reload=DEBUG,
+    cache_size=400,
+    bytecode_cache=FileSystemBytecodeCache(JINJA_BYTECODE_DIR)
+)
+
+# Device properties shown in the info panel: (key, getprop name)
+DEVICE_INFO_PROPERTIES = [
+    ('model', 'ro.product.model'),
+    ('device_name', 'ro.product.name'),
+    ('device', 'ro.product.device'),
+    ('version', 'ro.build.version.release'),
+    ('serial', 'ro.serialno'),
+    ('manufacturer', 'ro.product.manufacturer'),
+    ('brand', 'ro.product.brand')
+]
+
+# Shell snippets for get_device_info, one ===key=== section each (split back
+# with split_sections). Static ones can't change until the device
+# reconnects, so they are fetched once per device.
+DEVICE_STATIC_INFO_COMMANDS = [
+    (key, f'getprop {prop}') for key, prop in DEVICE_INFO_PROPERTIES
+] + [
+    ('uname', 'uname -a'),
+    # Whether free/df understand -h, so later refreshes skip the `|| free` fallback
+    ('free_h', 'free -h >/dev/null 2>&1 && echo yes'),
+    ('df_h', 'df -h >/dev/null 2>&1 && echo yes')
+]
+DEVICE_DYNAMIC_INFO_COMMANDS = [
+    ('battery', 'dumpsys battery 2>/dev/null'),
+    ('memory', 'free -h 2>/dev/null || free'),
+    ('storage', 'df -h 2>/dev/null || df'),
+    ('ip', "ip route get 1 2>/dev/null | awk '{print $7}' || ip addr show 2>/dev/null | grep 'inet ' | head -1 | awk '{print $2}' | cut -d'/' -f1 || hostname -I 2>/dev/null || echo 'N/A'")
+]
+
+def build_sections_script(commands):
+    """Une comandos en un solo script shell con líneas centinela ===clave==="""
+    return '; '.join(f"echo '==={key}==='; {command}" for key, command in commands)
+
+def split_sections(output):
+    """Divide una salida con líneas centinela ===clave=== en un dict"""
+    sections = {}
+    current = None
+    for line in (output or '').replace('\r\n', '\n').split('\n'):
+        stripped = line.strip()
+        if len(stripped) > 6 and stripped.startswith('===') and stripped.endswith('==='):
+            current = stripped[3:-3]
+            sections[current] = []
+        elif current is not None:
+            sections[current].append(line)
+    return {key: '\n'.join(lines) for key, lines in sections.items()}
+
+DEVICE_INFO_COMMANDS = DEVICE_STATIC_INFO_COMMANDS + DEVICE_DYNAMIC_INFO_COMMANDS
+DEVICE_INFO_SCRIPT = build_sections_script(DEVICE_INFO_COMMANDS)
+
+def build_dynamic_info_script(free_h, df_h):
+    """Script dinámico con el `free`/`df` que el dispositivo soporta, sin fallbacks"""
+    commands = dict(DEVICE_DYNAMIC_INFO_COMMANDS)
+    commands['memory'] = 'free -h' if free_h else 'free'
+    commands['storage'] = 'df -h' if df_h else 'df'
+    return build_sections_script(commands.items())
+
+def parse_key_values(text):
+    """Parsea líneas KEY=valor (config.py, archivos PID/tunnel) en un dict"""
+    values = {}
+    for line in (text or '').strip().split('\n'):
+        if '=' in line:
+            key, value = line.split('=', 1)
+            values[key.strip()] = value.strip().strip('"\'')
+    return values
+
+# list_web_apps: global venv check, then ===<app>/<file>=== sections with
+# the files read for every app (the trailing echo keeps markers on their own line)
+LIST_APPS_SCRIPT = (
+    "echo '===venv==='; [ -x /home/phablet/.ubtool/venv/bin/python ] && echo yes || echo no; "
+    "for d in /home/phablet/Apps/*/; do [ -d \"$d\" ] || continue; n=$(basename \"$d\"); "
+    "echo \"===$n/config===\"; cat \"$d/config.py\" 2>/dev/null; echo; "
+    "echo \"===$n/PID===\"; cat \"$d/PID\" 2>/dev/null; echo; "
+    "echo \"===$n/app.pid===\"; cat \"$d/app.pid\" 2>/dev/null; echo; "
+    "echo \"===$n/tunnel===\"; cat \"/home/phablet/.ubtool/tunnels/$n.tunnel\" 2>/dev/null; echo; "
+    "done"
+)
+
+# check_dev_tools: a missing tool leaves its section empty
+DEV_TOOLS_CHECK_SCRIPT = build_sections_script([
+    ('python', 'python3 --version 2>/dev/null'),
+    ('pip', 'pip3 --version 2>/dev/null'),
+    ('virtualenv', 'which virtualenv 2>/dev/null'),
+    ('disk_space', "df -h /home/phablet 2>/dev/null | tail -1 | awk '{print $4}'"),
+    ('memory', "free -h 2>/dev/null | grep '^Mem:' | awk '{print $7}'")
+])
+
+# One `<serial>\t<state>` entry per line of `adb devices`
+DEVICE_LINE_RE = re.compile(r'^(\S+)\t(\S+)', re.MULTILINE)
+
+def parse_device_list(output):
+    """Lista de dispositivos de `adb devices` / host:track-devices en una pasada"""
+    # The "List of devices attached" header has no tab, so it never matches
+    return [{'id': serial, 'status': state} for serial, state in DEVICE_LINE_RE.findall(output)]
+
+# Single pass over `dumpsys battery` output for every field we care about
+BATTERY_FIELD_RE = re.compile(r'\b(level|scale|percent|percentage)\b\s*[:=]\s*(\d+)', re.IGNORECASE)
+
+# Ubuntu release in `uname -a` (e.g. "Ubuntu 20.04")
+UBUNTU_VERSION_RE = re.compile(r'Ubuntu (\d+\.\d+)')
+
+# First number in a sysfs value such as power_supply/*/capacity
+DIGITS_RE = re.compile(r'(\d+)')
+
+# Mount shown as the device's main storage, if present
+DF_PREFERRED_MOUNTS = frozenset({'/data', '/userdata', '/', '/home', '/home/phablet'})
+
+# sysfs battery level files, tried before scanning /sys/class/power_supply
+BATTERY_CAPACITY_PATHS = (
+    '/sys/class/power_supply/battery/capacity',
+    '/sys/class/power_supply/BAT0/capacity'
+)
+
+# Web app names: also used as directory names and in shell commands
+APP_NAME_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+INVALID_APP_NAME_ERROR = 'Nombre de app inválido. Solo letras, números, guiones y guiones bajos'
+
+def is_valid_app_name(app_name):
+    """Un nombre de app seguro para rutas y comandos shell del dispositivo"""
+    return APP_NAME_RE.fullmatch(app_name) is not None
 
 class ADBManager:
     """Maneja las operaciones de ADB"""
     
+    __slots__ = (
+        'adb_path', '_devices_cache', '_devices_ttl', '_devices_inflight', 'shells',
+        '_adb_sem', '_tracked_devices', '_track_task', '_static_info_cache',
+        '_battery_path_cache', '_info_cache', '_info_inflight'
+    )
+    
     def __init__(self):
         self.adb_path = self._find_adb()
+        # Short-lived `adb devices` cache; concurrent callers share the
+        # single in-flight query (single-flight)
+        self._devices_cache = (None, 0.0)
+        self._devices_ttl = ADB_DEVICES_TTL
+        self._devices_inflight = None
+        # Long-lived `adb shell` per device for execute_shell_command
+        self.shells = ShellPool(self.adb_path)
+        # The adb server serializes USB traffic anyway; cap concurrent
+        # one-shot processes so request bursts don't fork dozens of them.
+        # Created on first use: before 3.10 a Semaphore binds to the loop
+        # current at construction, and this object is built at import time
+        self._adb_sem = None
+        # Device list pushed by the adb server (host:track-devices);
+        # None while the tracker is not connected
+        self._tracked_devices = None
+        self._track_task = None
+        # device_id -> (properties that can't change while it stays connected,
+        # dynamic info script tailored to the device)
+        self._static_info_cache = {}
+        # device_id -> sysfs `capacity` file that answered last time
+        self._battery_path_cache = {}
+        # device_id -> (full info, monotonic time); several widgets of the
+        # same page ask at once, they share one sweep (single-flight)
+        self._info_cache = {}
+        self._info_inflight = {}
     
     def _find_adb(self):
         """Busca el ejecutable de ADB en el sistema"""
-        # Common ADB paths
+        # Explicit override (Docker, CI...): trust it and skip every probe
+        env_path = os.getenv('ADB_PATH')
+        if env_path:
+            return env_path
+        
+        # Path found by a previous run; a stat is much cheaper than exec'ing adb
+        cached = self._load_cached_adb_path()
+        if cached:
+            return cached
+        
+        # On PATH: a directory scan, no process launched
+        path = shutil.which('adb')
+        if path:
+            self._save_cached_adb_path(path)
+            return path
+        
+        # Common locations outside PATH
         possible_paths = [
-            'adb',
             '/usr/bin/adb',
             '/usr/local/bin/adb',
             'platform-tools/adb',
@@ -58,58 +306,220 @@ class ADBManager:
         ]
         
         for path in possible_paths:
-            try:
-                result = subprocess.run([path, 'version'], 
-                                      capture_output=True, 
-                                      text=True, 
-                                      timeout=5)
-                if result.returncode == 0:
-                    return path
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                continue
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                self._save_cached_adb_path(path)
+                return path
+        
+        return None
+    
+    def _load_cached_adb_path(self):
+        """Lee la ruta de ADB guardada en caché si sigue siendo ejecutable"""
+        try:
+            with open(ADB_PATH_CACHE_FILE, 'r', encoding='utf-8') as f:
+                path = json.load(f).get('path')
+        except (OSError, ValueError, AttributeError):
+            return None
         
+        if path and os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
         return None
     
+    def _save_cached_adb_path(self, path):
+        """Guarda la ruta absoluta de ADB para el próximo arranque"""
+        # Bare names like 'adb' depend on PATH; store the resolved location
+        resolved = shutil.which(path) or os.path.abspath(path)
+        try:
+            os.makedirs(os.path.dirname(ADB_PATH_CACHE_FILE), exist_ok=True)
+            with open(ADB_PATH_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'path': resolved}, f)
+        except OSError as e:
+            logger.warning("No se pudo guardar la caché de ADB: %s", e)
+    
     def is_available(self):
         """Verifica si ADB está disponible"""
         return self.adb_path is not None
     
-    def get_devices(self):
+    async def run(self, *args, timeout=10, text=True, input=None):
+        """Ejecuta adb sin bloquear el event loop.
+
+        Devuelve un ``subprocess.CompletedProcess`` y lanza
+        ``subprocess.TimeoutExpired`` igual que ``subprocess.run``.
+        ``input`` (bytes) se envía por stdin al comando.
+        """
+        cmd = [self.adb_path or 'adb', *args]
+        if self._adb_sem is None:
+            self._adb_sem = asyncio.Semaphore(ADB_MAX_CONCURRENCY)
+        async with self._adb_sem:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.PIPE if input is not None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(input), timeout=timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            except asyncio.CancelledError:
+                # Request dropped or server stopping: don't leave adb behind
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                await proc.wait()
+                raise
+        
+        if text:
+            stdout = stdout.decode('utf-8', errors='replace')
+            stderr = stderr.decode('utf-8', errors='replace')
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    
+    async def stream(self, *args, chunk_size=64 * 1024):
+        """Lanza adb y devuelve (proceso, generador asíncrono de su stdout).
+        
+        No ocupa el semáforo: la descarga dura lo que tarde el cliente en
+        leerla. El generador mata el proceso si se abandona a medias.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            self.adb_path or 'adb', *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        
+        async def chunks():
+            try:
+                while True:
+                    chunk = await proc.stdout.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                if proc.returncode is None:
+                    try:
+                        proc.kill()
+                    except ProcessLookupError:
+                        pass
+                await proc.wait()
+        
+        return proc, chunks()
+    
+    async def shell(self, device_id, command, timeout=10):
+        """Ejecuta un comando en el shell persistente del dispositivo.
+        
+        Si el shell está ocupado o roto se usa un `adb shell` de un solo uso.
+        Devuelve un ``subprocess.CompletedProcess`` como ``run``.
+        """
+        try:
+            stdout, stderr, return_code = await self.shells.run(device_id, command, timeout=timeout)
+        except ShellError:
+            return await self.run('-s', device_id, 'shell', command, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(command, timeout)
+        return subprocess.CompletedProcess(command, return_code, stdout, stderr)
+    
+    async def _open_adb_service(self, service):
+        """Abre una conexión al servidor ADB y solicita un servicio host"""
+        reader, writer = await asyncio.open_connection(ADB_SERVER_HOST, ADB_SERVER_PORT)
+        try:
+            request = service.encode('utf-8')
+            writer.write(b'%04x' % len(request) + request)
+            await writer.drain()
+            status = await reader.readexactly(4)
+            if status != b'OKAY':
+                message = await self._read_adb_message(reader)
+                raise ConnectionError(f'{service}: {message.decode("utf-8", errors="replace")}')
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+    
+    async def _read_adb_message(self, reader):
+        """Lee un mensaje con prefijo de longitud hexadecimal (4 dígitos)"""
+        length = int(await reader.readexactly(4), 16)
+        return await reader.readexactly(length) if length else b''
+    
+    async def _track_devices(self):
+        """Mantiene la lista de dispositivos actualizada con host:track-devices"""
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._open_adb_service('host:track-devices')
+                while True:
+                    payload = (await self._read_adb_message(reader)).decode('utf-8', errors='replace')
+                    self._tracked_devices = parse_device_list(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # adb server not running yet (the `adb devices` fallback
+                # starts it) or it went away: poll until it is back
+                pass
+            finally:
+                self._tracked_devices = None
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(2)
+    
+    def _ensure_tracker(self):
+        """Lanza el seguimiento de dispositivos en el event loop actual"""
+        loop = asyncio.get_running_loop()
+        task = self._track_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._tracked_devices = None
+            self._track_task = loop.create_task(self._track_devices())
+    
+    async def get_devices(self):
         """Obtiene la lista de dispositivos conectados"""
         if not self.is_available():
             return []
         
+        # Pushed by the adb server: no process or socket round-trip at all
+        self._ensure_tracker()
+        if self._tracked_devices is not None:
+            return [dict(device) for device in self._tracked_devices]
+        
+        devices, ts = self._devices_cache
+        if devices is not None and time.monotonic() - ts < self._devices_ttl:
+            return list(devices)
+        
+        # The query runs in its own task so a caller that goes away
+        # (cancelled request) doesn't cancel it for everyone else
+        if self._devices_inflight is None:
+            self._devices_inflight = asyncio.get_running_loop().create_task(self._refresh_devices())
+        devices = await asyncio.shield(self._devices_inflight)
+        return list(devices)
+    
+    async def _refresh_devices(self):
+        """Consulta `adb devices` y actualiza la caché"""
         try:
-            result = subprocess.run([self.adb_path, 'devices'], 
-                                  capture_output=True, 
-                                  text=True, 
-                                  timeout=10)
-            
-            devices = []
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            
-            for line in lines:
-                if line.strip():
-                    parts = line.split('\t')
-                    if len(parts) >= 2:
-                        devices.append({
-                            'id': parts[0],
-                            'status': parts[1]
-                        })
-            
+            devices = await self._query_devices()
+            self._devices_cache = (devices, time.monotonic())
             return devices
+        finally:
+            self._devices_inflight = None
+    
+    def invalidate_devices_cache(self):
+        """Descarta la lista de dispositivos en caché"""
+        self._devices_cache = (None, 0.0)
+    
+    async def _query_devices(self):
+        """Ejecuta `adb devices` y parsea la salida"""
+        try:
+            result = await self.run('devices', timeout=10)
+            return parse_device_list(result.stdout)
         except subprocess.TimeoutExpired:
             return []
         except Exception as e:
-            print(f"Error getting devices: {e}")
+            logger.error("Error getting devices: %s", e)
             return []
     
-    def get_device_info(self, device_id=None):
+    async def get_device_info(self, device_id=None):
         """Obtiene información detallada del dispositivo"""
         if not self.is_available():
             return None
         
-        devices = self.get_devices()
+        devices = await self.get_devices()
         if not devices:
             return None
         
@@ -117,274 +527,266 @@ class ADBManager:
         if not device_id:
             device_id = devices[0]['id']
         
+        # Forget static info of devices that are gone (they may come back rebooted/updated)
+        connected = {device['id'] for device in devices}
+        for stale_id in [d for d in self._static_info_cache if d not in connected]:
+            del self._static_info_cache[stale_id]
+        for stale_id in [d for d in self._battery_path_cache if d not in connected]:
+            del self._battery_path_cache[stale_id]
+        for stale_id in [d for d in self._info_cache if d not in connected]:
+            del self._info_cache[stale_id]
+        
+        cached = self._info_cache.get(device_id)
+        if cached is not None and time.monotonic() - cached[1] < DEVICE_INFO_TTL:
+            return dict(cached[0])
+        
+        # Shielded like the devices query: a cancelled request must not
+        # cancel the sweep other callers are waiting on
+        task = self._info_inflight.get(device_id)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._refresh_device_info(device_id))
+            self._info_inflight[device_id] = task
+        info = await asyncio.shield(task)
+        return dict(info) if info else info
+    
+    async def _refresh_device_info(self, device_id):
+        """Consulta la información del dispositivo y actualiza la caché"""
         try:
-            info = {}
-            
-            # Get device properties
-            properties = [
-                ('model', 'ro.product.model'),
-                ('device_name', 'ro.product.name'),
-                ('device', 'ro.product.device'),
-                ('version', 'ro.build.version.release'),
-                ('serial', 'ro.serialno'),
-                ('manufacturer', 'ro.product.manufacturer'),
-                ('brand', 'ro.product.brand')
-            ]
-            
-            for key, prop in properties:
-                try:
-                    result = subprocess.run([
-                        self.adb_path, '-s', device_id, 'shell', 'getprop', prop
-                    ], capture_output=True, text=True, timeout=5)
-                    
-                    if result.returncode == 0:
-                        info[key] = result.stdout.strip()
-                    else:
-                        info[key] = 'N/A'
-                except subprocess.TimeoutExpired:
-                    info[key] = 'Timeout'
+            info = await self._fetch_device_info(device_id)
+            if info:
+                self._info_cache[device_id] = (info, time.monotonic())
+            return info
+        finally:
+            self._info_inflight.pop(device_id, None)
+    
+    async def _fetch_device_info(self, device_id):
+        """Lee propiedades, batería, memoria, almacenamiento e IP en un solo barrido"""
+        try:
+            static_info, script = self._static_info_cache.get(device_id, (None, None))
+            if static_info:
+                commands = DEVICE_DYNAMIC_INFO_COMMANDS
+            else:
+                commands, script = DEVICE_INFO_COMMANDS, DEVICE_INFO_SCRIPT
             
-            # Get battery info
+            # Everything in one shell round-trip, one ===key=== section each
             try:
-                result = subprocess.run([
-                    self.adb_path, '-s', device_id, 'shell', 
-                    'dumpsys', 'battery'
-                ], capture_output=True, text=True, timeout=10)
-                
-                if result.returncode == 0:
-                    battery_info = self._parse_battery_info(result.stdout)
-                    info['battery'] = battery_info
-                else:
-                    info['battery'] = 'N/A'
+                result = await self.shell(device_id, script, timeout=15)
+                sections = split_sections(result.stdout)
+                if not sections:
+                    # The combined script didn't come back (odd shell/quoting);
+                    # ask for each section separately but concurrently
+                    sections = await self._gather_sections(device_id, commands)
             except subprocess.TimeoutExpired:
-                info['battery'] = 'Timeout'
+                sections = None
+            
+            if sections is None:
+                info = dict(static_info) if static_info else {
+                    **{key: 'Timeout' for key, _prop in DEVICE_INFO_PROPERTIES},
+                    'os_info': 'Timeout', 'os_name': 'Timeout', 'os_version': 'Timeout'
+                }
+                info.update({
+                    'battery': 'Timeout', 'memory': None, 'storage': None,
+                    'ip_address': 'Timeout'
+                })
+            else:
+                if static_info is None:
+                    static_info = {}
+                    for key, _prop in DEVICE_INFO_PROPERTIES:
+                        static_info[key] = sections[key].strip() if key in sections else 'N/A'
+                    static_info.update(self._parse_uname(sections.get('uname', '').strip()))
+                    # Only remember a complete answer
+                    if all(key in sections for key, _cmd in DEVICE_STATIC_INFO_COMMANDS):
+                        self._static_info_cache[device_id] = (static_info, build_dynamic_info_script(
+                            sections['free_h'].strip() == 'yes',
+                            sections['df_h'].strip() == 'yes'
+                        ))
+                info = dict(static_info)
+                
+                battery = sections.get('battery', '')
+                info['battery'] = self._parse_battery_info(battery) if battery.strip() else 'N/A'
+                
+                memory = sections.get('memory', '')
+                info['memory'] = self._parse_free_output(memory) if memory.strip() else None
+                
+                storage = sections.get('storage', '')
+                info['storage'] = self._parse_df_output(storage) if storage.strip() else None
+                
+                ip = sections.get('ip', '').strip()
+                info['ip_address'] = ip if ip and ip != 'N/A' else 'N/A'
 
             # Fallback for battery percentage (Ubuntu Touch / non-standard dumpsys)
             if not info.get('battery') or info.get('battery') in {'N/A', 'Timeout'}:
-                fallback_battery = self._get_battery_percentage_sysfs(device_id)
+                fallback_battery = await self._get_battery_percentage_sysfs(device_id)
                 if fallback_battery:
                     info['battery'] = fallback_battery
-
-            # Get memory info
-            try:
-                result = subprocess.run([
-                    self.adb_path, '-s', device_id, 'shell',
-                    "free -h 2>/dev/null || free"
-                ], capture_output=True, text=True, timeout=10)
-                if result.returncode == 0 and result.stdout.strip():
-                    info['memory'] = self._parse_free_output(result.stdout)
-                else:
-                    info['memory'] = None
-            except subprocess.TimeoutExpired:
-                info['memory'] = None
-
-            # Get storage info
-            try:
-                result = subprocess.run([
-                    self.adb_path, '-s', device_id, 'shell',
-                    "df -h 2>/dev/null || df"
-                ], capture_output=True, text=True, timeout=10)
-                if result.returncode == 0 and result.stdout.strip():
-                    info['storage'] = self._parse_df_output(result.stdout)
-                else:
-                    info['storage'] = None
-            except subprocess.TimeoutExpired:
-                info['storage'] = None
-            
-            # Get OS info
-            try:
-                result = subprocess.run([
-                    self.adb_path, '-s', device_id, 'shell',
-                    'uname -a'
-                ], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    uname_info = result.stdout.strip()
-                    info['os_info'] = uname_info
-                    # Parse OS name and version from uname
-                    if 'Ubuntu' in uname_info:
-                        info['os_name'] = 'Ubuntu Touch'
-                        # Try to extract version
-                        import re
-                        version_match = re.search(r'Ubuntu (\d+\.\d+)', uname_info)
-                        if version_match:
-                            info['os_version'] = version_match.group(1)
-                    else:
-                        info['os_name'] = uname_info
-                else:
-                    info['os_info'] = 'N/A'
-                    info['os_name'] = 'N/A'
-                    info['os_version'] = 'N/A'
-            except subprocess.TimeoutExpired:
-                info['os_info'] = 'Timeout'
-                info['os_name'] = 'Timeout'
-                info['os_version'] = 'Timeout'
-
-            # Get IP address
-            try:
-                result = subprocess.run([
-                    self.adb_path, '-s', device_id, 'shell',
-                    "ip route get 1 2>/dev/null | awk '{print $7}' || ip addr show 2>/dev/null | grep 'inet ' | head -1 | awk '{print $2}' | cut -d'/' -f1 || hostname -I 2>/dev/null || echo 'N/A'"
-                ], capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    ip = result.stdout.strip()
-                    info['ip_address'] = ip if ip and ip != 'N/A' else 'N/A'
-                else:
-                    info['ip_address'] = 'N/A'
-            except subprocess.TimeoutExpired:
-                info['ip_address'] = 'Timeout'
-            
             return info
             
         except Exception as e:
-            print(f"Error getting device info: {e}")
+            logger.error("Error getting device info: %s", e)
             return None
     
+    async def _gather_sections(self, device_id, commands):
+        """Ejecuta cada comando (clave, comando) por separado y en paralelo"""
+        results = await asyncio.gather(
+            *(self.run('-s', device_id, 'shell', command, timeout=5) for _key, command in commands),
+            return_exceptions=True
+        )
+        return {
+            key: result.stdout
+            for (key, _command), result in zip(commands, results)
+            if isinstance(result, subprocess.CompletedProcess)
+        }
+    
+    def _parse_uname(self, uname_info):
+        """Obtiene nombre y versión del sistema a partir de `uname -a`"""
+        if not uname_info:
+            return {'os_info': 'N/A', 'os_name': 'N/A', 'os_version': 'N/A'}
+        
+        os_info = {'os_info': uname_info}
+        # Parse OS name and version from uname
+        if 'Ubuntu' in uname_info:
+            os_info['os_name'] = 'Ubuntu Touch'
+            version_match = UBUNTU_VERSION_RE.search(uname_info)
+            if version_match:
+                os_info['os_version'] = version_match.group(1)
+        else:
+            os_info['os_name'] = uname_info
+        return os_info
+    
     def _parse_battery_info(self, battery_output):
         """Parsea la información de la batería"""
-        try:
-            text = battery_output or ''
-            level = None
-            scale = None
-
-            # Common outputs:
-            # level: 44
-            # scale: 100
-            # or sometimes key=value
-            m_level = re.search(r'\blevel\b\s*[:=]\s*(\d+)', text, flags=re.IGNORECASE)
-            if m_level:
-                try:
-                    level = int(m_level.group(1))
-                except Exception:
-                    level = None
-
-            m_scale = re.search(r'\bscale\b\s*[:=]\s*(\d+)', text, flags=re.IGNORECASE)
-            if m_scale:
-                try:
-                    scale = int(m_scale.group(1))
-                except Exception:
-                    scale = None
-
-            # Some systems expose percentage directly
-            m_pct = re.search(r'\b(percent|percentage)\b\s*[:=]\s*(\d+)', text, flags=re.IGNORECASE)
-            if m_pct:
-                try:
-                    return f"{int(m_pct.group(2))}%"
-                except Exception:
-                    pass
+        # Common outputs:
+        # level: 44
+        # scale: 100
+        # or sometimes key=value; some systems expose percent(age) directly
+        fields = {}
+        for match in BATTERY_FIELD_RE.finditer(battery_output or ''):
+            fields.setdefault(match.group(1).lower(), int(match.group(2)))
+
+        pct = fields.get('percent', fields.get('percentage'))
+        if pct is not None:
+            return f"{pct}%"
 
-            if level is None:
-                return 'N/A'
+        level = fields.get('level')
+        if level is None:
+            return 'N/A'
 
-            if scale and scale > 0:
-                pct = round((level / scale) * 100)
-                return f"{pct}%"
+        scale = fields.get('scale')
+        if scale and scale > 0:
+            return f"{round((level / scale) * 100)}%"
 
-            return f"{level}%"
-        except:
-            return 'N/A'
+        return f"{level}%"
 
-    def _get_battery_percentage_sysfs(self, device_id):
+    async def _get_battery_percentage_sysfs(self, device_id):
         """Fallback: intenta leer porcentaje desde /sys/class/power_supply/*/capacity"""
         try:
-            cmd = (
-                "cat /sys/class/power_supply/battery/capacity 2>/dev/null "
-                "|| cat /sys/class/power_supply/BAT0/capacity 2>/dev/null "
-                "|| (ls /sys/class/power_supply 2>/dev/null | while read d; do "
-                "cat /sys/class/power_supply/$d/capacity 2>/dev/null && break; "
-                "done)"
-            )
-            result = subprocess.run([
-                self.adb_path, '-s', device_id, 'shell', cmd
-            ], capture_output=True, text=True, timeout=5)
-
-            if result.returncode != 0:
-                return None
-
-            raw = (result.stdout or '').strip().splitlines()
-            if not raw:
-                return None
+            cached = self._battery_path_cache.get(device_id)
+            if cached:
+                pct = await self._read_battery_capacity(device_id, cached)
+                if pct is not None:
+                    return f"{pct}%"
+                del self._battery_path_cache[device_id]
+
+            async for path in self._battery_capacity_candidates(device_id):
+                pct = await self._read_battery_capacity(device_id, path)
+                if pct is not None:
+                    # Next refreshes go straight to the path that worked
+                    self._battery_path_cache[device_id] = path
+                    return f"{pct}%"
+            return None
+        except Exception:
+            return None
 
-            first = raw[0].strip()
-            if not first:
-                return None
+    async def _battery_capacity_candidates(self, device_id):
+        """Rutas `capacity` posibles: las habituales y luego cada power_supply"""
+        for path in BATTERY_CAPACITY_PATHS:
+            yield path
+        # Only reached when none of the usual paths worked
+        result = await self.shell(device_id, 'ls /sys/class/power_supply', timeout=5)
+        if result.returncode == 0:
+            for name in result.stdout.split():
+                path = f'/sys/class/power_supply/{name}/capacity'
+                if path not in BATTERY_CAPACITY_PATHS:
+                    yield path
+
+    async def _read_battery_capacity(self, device_id, path):
+        """Lee un archivo `capacity`; devuelve el porcentaje o None"""
+        result = await self.shell(device_id, f"cat {shlex.quote(path)}", timeout=5)
+        if result.returncode != 0:
+            return None
 
-            m = re.search(r'(\d+)', first)
+        value = (result.stdout or '').strip()
+        try:
+            # capacity is normally a bare integer like "87"
+            pct = int(value)
+        except ValueError:
+            m = DIGITS_RE.search(value)
             if not m:
                 return None
-
             pct = int(m.group(1))
-            if pct < 0 or pct > 100:
-                return None
-
-            return f"{pct}%"
-        except Exception:
+        if pct < 0 or pct > 100:
             return None
+        return pct
 
     def _parse_free_output(self, free_output):
         try:
-            lines = [l.strip() for l in free_output.split('\n') if l.strip()]
-            mem_line = None
-            for l in lines:
-                if l.lower().startswith('mem:') or l.lower().startswith('mem '):
-                    mem_line = l
+            for line in free_output.splitlines():
+                parts = line.split()
+                if parts and parts[0].lower() in ('mem:', 'mem'):
                     break
-            if not mem_line:
+            else:
                 return None
 
-            parts = mem_line.replace('\t', ' ').split()
             if len(parts) < 4:
                 return None
 
-            def _safe_get(i):
-                return parts[i] if i < len(parts) else None
-
             return {
-                'total': _safe_get(1),
-                'used': _safe_get(2),
-                'free': _safe_get(3),
-                'available': _safe_get(6) if len(parts) >= 7 else _safe_get(3)
+                'total': parts[1],
+                'used': parts[2],
+                'free': parts[3],
+                'available': parts[6] if len(parts) >= 7 else parts[3]
             }
         except Exception:
             return None
 
     def _parse_df_output(self, df_output):
         try:
-            lines = [l.rstrip() for l in df_output.split('\n') if l.strip()]
-            if not lines:
-                return None
-
             out = []
-            for line in lines[1:]:
-                parts = line.split()
+            primary = None
+            # First line is the header
+            for line in df_output.strip().splitlines()[1:]:
+                # Six fields at most: a mount point may contain spaces
+                parts = line.split(None, 5)
                 if len(parts) < 6:
                     continue
-                out.append({
+                entry = {
                     'filesystem': parts[0],
                     'size': parts[1],
                     'used': parts[2],
                     'avail': parts[3],
                     'use_percent': parts[4],
                     'mount': parts[5]
-                })
+                }
+                out.append(entry)
+                if primary is None and parts[5] in DF_PREFERRED_MOUNTS:
+                    primary = entry
 
             if not out:
                 return None
 
-            preferred_mounts = {'/data', '/userdata', '/', '/home', '/home/phablet'}
-            preferred = [e for e in out if e.get('mount') in preferred_mounts]
             return {
-                'primary': preferred[0] if preferred else out[0],
+                'primary': primary or out[0],
                 'entries': out
             }
         except Exception:
             return None
     
-    def execute_shell_command(self, command, device_id=None):
+    async def execute_shell_command(self, command, device_id=None):
         """Ejecuta un comando shell en el dispositivo"""
         if not self.is_available():
             return {'error': 'ADB no disponible'}
         
-        devices = self.get_devices()
+        devices = await self.get_devices()
         if not devices:
             return {'error': 'No hay dispositivos conectados'}
         
@@ -393,9 +795,7 @@ class ADBManager:
             device_id = devices[0]['id']
         
         try:
-            result = subprocess.run([
-                self.adb_path, '-s', device_id, 'shell', command
-            ], capture_output=True, text=True, timeout=30)
+            result = await self.shell(device_id, command, timeout=30)
             
             return {
                 'output': result.stdout,
@@ -408,12 +808,12 @@ class ADBManager:
         except Exception as e:
             return {'error': str(e)}
     
-    def reboot_device(self, device_id=None):
+    async def reboot_device(self, device_id=None):
         """Reinicia el dispositivo"""
         if not self.is_available():
             return {'success': False, 'error': 'ADB no disponible'}
         
-        devices = self.get_devices()
+        devices = await self.get_devices()
         if not devices:
             return {'success': False, 'error': 'No hay dispositivos conectados'}
         
@@ -422,9 +822,12 @@ class ADBManager:
             device_id = devices[0]['id']
         
         try:
-            result = subprocess.run([
-                self.adb_path, '-s', device_id, 'reboot'
-            ], capture_output=True, text=True, timeout=10)
+            result = await self.run('-s', device_id, 'reboot', timeout=10)
+            # The device drops off the bus while rebooting
+            self.invalidate_devices_cache()
+            self.shells.close(device_id)
+            self._static_info_cache.pop(device_id, None)
+            self._info_cache.pop(device_id, None)
             
             return {
                 'success': result.returncode == 0,
@@ -443,83 +846,219 @@ terminal_manager = TerminalManager(adb_manager)
 # Template rendering function
 def render_template(template_name, **context):
     """Renderiza un template Jinja2"""
-    template_path = os.path.join('templates', template_name)
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+    return JINJA_ENV.get_template(template_name).render(**context)
+
+# JSON helpers
+JSON_HEADERS = {'Content-Type': 'application/json; charset=UTF-8'}
+
+def json_dumps(payload):
+    """Serializa a JSON en bytes, con orjson si está disponible"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib handles them
+            pass
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def json_loads(data):
+    """Parsea JSON (str o bytes), con orjson si está disponible"""
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_response(payload, status_code=200):
+    """Respuesta JSON serializada con json_dumps"""
+    return Response(json_dumps(payload), status_code=status_code, headers=JSON_HEADERS)
+
+# Constant payloads of the hot/error paths, encoded once. A new Response is
+# built per request because after_request handlers (CORS) mutate headers.
+_NOT_FOUND_BODY = json_dumps({'error': 'Not found'})
+_SERVER_ERROR_BODY = json_dumps({'error': 'Internal server error'})
+_ADB_UNAVAILABLE_STATUS_BODY = json_dumps({
+    'connected': False,
+    'error': 'ADB no disponible',
+    'devices': []
+})
+_NO_DEVICES_STATUS_BODY = json_dumps({
+    'connected': False,
+    'devices': []
+})
+_SUCCESS_BODY = json_dumps({'success': True})
+_TERMINAL_NOT_FOUND_BODY = json_dumps({
+    'success': False,
+    'error': 'Sesión no encontrada'
+})
+
+# Context-free pages are rendered and compressed once, then served from memory
+STATIC_PAGES = ('home.html', 'apps.html', 'dev-env.html', 'ia_assistant.html')
+_PAGE_CACHE = {}
+
+def build_page_variants(template_name):
+    """Renderiza una página y sus variantes comprimidas"""
+    html = render_template(template_name).encode('utf-8')
+    variants = {'gzip': gzip.compress(html, 9), 'identity': html}
+    if brotli is not None:
+        variants['br'] = brotli.compress(html, quality=11)
+    return variants
+
+def warm_page_cache():
+    """Pre-renderiza las páginas sin contexto antes de aceptar peticiones"""
+    for template_name in STATIC_PAGES:
+        _PAGE_CACHE[template_name] = build_page_variants(template_name)
+
+def render_static_page(request, template_name):
+    """Sirve una página sin contexto, usando la variante comprimida que acepte el cliente"""
+    variants = None if DEBUG else _PAGE_CACHE.get(template_name)
+    if variants is None:
+        variants = build_page_variants(template_name)
+        _PAGE_CACHE[template_name] = variants
     
-    from jinja2 import Environment, FileSystemLoader
-    env = Environment(loader=FileSystemLoader('templates'))
-    template = env.from_string(template_content)
-    return template.render(**context)
+    accepted = {
+        part.split(';')[0].strip().lower()
+        for part in request.headers.get('Accept-Encoding', '').split(',')
+    }
+    headers = {'Content-Type': 'text/html; charset=utf-8', 'Vary': 'Accept-Encoding'}
+    for encoding in ('br', 'gzip'):
+        if encoding in variants and encoding in accepted:
+            headers['Content-Encoding'] = encoding
+            return Response(variants[encoding], headers=headers)
+    return Response(variants['identity'], headers=headers)
 
 # Routes
 @app.route('/')
 async def index(request):
     """Página principal"""
-    from microdot import Response
-    html_content = render_template('home.html')
-    return Response(html_content, headers={'Content-Type': 'text/html; charset=utf-8'})
+    return render_static_page(request, 'home.html')
 
 
 @app.route('/apps')
 async def apps_page(request):
     """Página de apps instaladas"""
-    from microdot import Response
-    html_content = render_template('apps.html')
-    return Response(html_content, headers={'Content-Type': 'text/html; charset=utf-8'})
+    return render_static_page(request, 'apps.html')
 
 
 @app.route('/dev-env')
 async def dev_env_page(request):
     """Página de preparación de entorno de desarrollo"""
-    from microdot import Response
-    html_content = render_template('dev-env.html')
-    return Response(html_content, headers={'Content-Type': 'text/html; charset=utf-8'})
+    return render_static_page(request, 'dev-env.html')
+
+
+# Static assets are few and small: keep them in memory, bigger files are streamed
+STATIC_ROOT = os.path.realpath('static')
+STATIC_CACHE_MAX_FILE_SIZE = 1024 * 1024
+# Types of what ./static actually holds; anything else goes through mimetypes
+STATIC_MIME_TYPES = {
+    '.js': 'application/javascript',
+    '.css': 'text/css',
+    '.html': 'text/html; charset=utf-8',
+    '.svg': 'image/svg+xml',
+    '.png': 'image/png',
+    '.ico': 'image/x-icon',
+    '.woff2': 'font/woff2',
+    '.json': 'application/json'
+}
+
+
+@lru_cache(maxsize=256)
+def _mime_for_ext(ext):
+    return mimetypes.guess_type('file' + ext)[0]
+
+
+def guess_mime(path):
+    """Tipo MIME de una ruta (local o del dispositivo) según su extensión, o None"""
+    # The file manager asks again for every file opened: cache per extension
+    return _mime_for_ext(posixpath.splitext(path)[1].lower())
+
+
+@lru_cache(maxsize=256)
+def _load_static(path, mtime_ns, size):
+    """Lee un archivo estático y su Content-Type (mtime/size invalidan la caché)"""
+    content_type = STATIC_MIME_TYPES.get(os.path.splitext(path)[1].lower())
+    if content_type is None:
+        content_type = guess_mime(path) or 'application/octet-stream'
+    if size > STATIC_CACHE_MAX_FILE_SIZE:
+        return None, content_type
+    with open(path, 'rb') as f:
+        return f.read(), content_type
 
 
 @app.route('/static/<path:path>')
 def static_files(request, path):
     """Servir archivos estáticos desde ./static"""
-    from microdot import Response
 
-    static_root = os.path.abspath('static')
-    requested_path = os.path.abspath(os.path.join(static_root, path))
+    requested_path = os.path.realpath(os.path.join(STATIC_ROOT, path))
 
-    # Prevent path traversal
-    if not (requested_path == static_root or requested_path.startswith(static_root + os.sep)):
+    # Prevent path traversal, including through symlinks inside ./static
+    if not (requested_path == STATIC_ROOT or requested_path.startswith(STATIC_ROOT + os.sep)):
         return Response('Not found', status_code=404)
 
     if not os.path.isfile(requested_path):
         return Response('Not found', status_code=404)
 
-    content_type, _ = mimetypes.guess_type(requested_path)
-    if not content_type:
-        content_type = 'application/octet-stream'
+    # Cheap validator: a changed file always changes mtime or size
+    st = os.stat(requested_path)
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    if request.args.get('v'):
+        # Versioned URL (?v=...): the content behind it never changes
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        # Plain URL: let the browser keep it but revalidate with If-None-Match
+        cache_control = 'public, no-cache'
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+
+    if etag in request.headers.get('If-None-Match', ''):
+        return Response('', status_code=304, headers=headers)
+
+    body, content_type = _load_static(requested_path, st.st_mtime_ns, st.st_size)
+    if body is not None:
+        headers['Content-Type'] = content_type
+        return Response(body, headers=headers)
 
-    with open(requested_path, 'rb') as f:
-        data = f.read()
+    # Stream the file instead of reading it whole into memory
+    response = Response.send_file(requested_path, content_type=content_type)
+    response.headers.update(headers)
+    response.headers['Content-Length'] = str(st.st_size)
+    return response
 
-    return Response(data, headers={'Content-Type': content_type})
+# Encoded /api/terminal/sessions body, keyed on the ids of the active
+# sessions (everything listed per session is fixed at creation)
+_sessions_cache = {'key': None, 'body': None, 'etag': None}
 
-@app.route('/api/terminal/sessions', methods=['GET'])
-def list_terminal_sessions():
+@app.get('/api/terminal/sessions')
+async def list_terminal_sessions(request):
     """Listar todas las sesiones de terminal activas"""
     try:
-        sessions = []
-        for session_id, session in terminal_manager.sessions.items():
-            if session.active:
+        active = tuple(
+            session_id for session_id, session in terminal_manager.sessions.items()
+            if session.active
+        )
+        if _sessions_cache['key'] != active:
+            sessions = []
+            for session_id in active:
+                session = terminal_manager.sessions[session_id]
                 sessions.append({
                     'session_id': session_id,
                     'device_id': session.device_id,
-                    'created_at': time.time()
+                    'created_at': session.created_at
                 })
-        
-        return json.dumps({
-            'success': True,
-            'sessions': sessions
-        })
+            body = json_dumps({
+                'success': True,
+                'sessions': sessions
+            })
+            _sessions_cache['body'] = body
+            _sessions_cache['etag'] = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            _sessions_cache['key'] = active
+        
+        # Pollers revalidate every time and get a 304 while nothing changed
+        headers = {'ETag': _sessions_cache['etag'], 'Cache-Control': 'private, no-cache'}
+        if _sessions_cache['etag'] in request.headers.get('If-None-Match', ''):
+            return Response('', status_code=304, headers=headers)
+        headers.update(JSON_HEADERS)
+        return Response(_sessions_cache['body'], headers=headers)
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -529,16 +1068,15 @@ def list_terminal_sessions():
 async def list_packages(request):
     """API: Listar paquetes instalados en el entorno virtual"""
     try:
-        adb_bin = adb_manager.adb_path or 'adb'
         global_venv_python = "/home/phablet/.ubtool/venv/bin/python"
         
         # List packages using pip list
         cmd = f"{global_venv_python} -m pip list --format=json"
-        result = subprocess.run([adb_bin, 'shell', cmd], capture_output=True, text=True, timeout=30)
+        result = await adb_manager.run('shell', cmd, timeout=30)
         
         if result.returncode == 0:
             try:
-                packages_data = json.loads(result.stdout)
+                packages_data = json_loads(result.stdout)
                 packages = []
                 
                 for pkg in packages_data:
@@ -592,12 +1130,11 @@ async def install_package(request):
                 'error': 'Nombre del paquete requerido'
             }
         
-        adb_bin = adb_manager.adb_path or 'adb'
         global_venv_pip = "/home/phablet/.ubtool/venv/bin/pip"
         
         # Install package
         cmd = f"{global_venv_pip} install {package_name}"
-        result = subprocess.run([adb_bin, 'shell', cmd], capture_output=True, text=True, timeout=180)
+        result = await adb_manager.run('shell', cmd, timeout=180)
         
         if result.returncode == 0:
             return {
@@ -616,11 +1153,23 @@ async def install_package(request):
         }
 
 
+# Command output sent back in 'details' keeps only its tail: apt and pip
+# can print hundreds of KB
+COMMAND_DETAILS_CHARS = 4096
+
+def output_tail(text, limit=COMMAND_DETAILS_CHARS):
+    """Final de la salida de un comando, recortado para devolverlo en JSON"""
+    return (text or '').strip()[-limit:]
+
+# Printed after every completed step of /api/devtools/prepare_env
+PREPARE_STEP_MARKER = '===ubtool-step-ok==='
+# Upper bound for the whole prepare_env chain (apt update/install + pip)
+PREPARE_ENV_TIMEOUT = 1800
+
 @app.route('/api/devtools/prepare_env', methods=['POST'])
 async def prepare_dev_environment(request):
     """API: Preparar entorno de desarrollo completo"""
     try:
-        adb_bin = adb_manager.adb_path or 'adb'
         
         # Commands to prepare development environment
         commands = [
@@ -643,18 +1192,36 @@ async def prepare_dev_environment(request):
             "/home/phablet/.ubtool/venv/bin/pip install flask fastapi microdot jinja2 requests flask-cors"
         ]
         
-        for cmd in commands:
-            result = subprocess.run([adb_bin, 'shell', cmd], capture_output=True, text=True, timeout=300)
-            if result.returncode != 0:
-                return {
-                    'success': False,
-                    'error': f'Error en comando: {cmd}',
-                    'details': result.stderr
-                }
+        devices = await adb_manager.get_devices()
+        if not devices:
+            return {
+                'success': False,
+                'error': 'No hay dispositivos conectados'
+            }
+        
+        # apt/pip progress is only wanted with ?verbose=1; otherwise it is
+        # dropped on the device instead of being piped back through adb
+        verbose = bool(request.args.get('verbose'))
+        redirect = '' if verbose else ' >/dev/null'
+        
+        # One adb round-trip for the whole chain; each step echoes a marker
+        # once it succeeds so a failure can still be pinned to its command.
+        # apt can take many minutes: it runs as a background job (outside the
+        # adb slots, queued with the pip installs that share the venv) that
+        # the page follows through /api/devtools/install_status
+        script = ' && '.join(
+            f"{cmd}{redirect} && echo '{PREPARE_STEP_MARKER}'" for cmd in commands
+        )
+        job_id = start_install_job(
+            None, devices[0]['id'], script,
+            timeout=PREPARE_ENV_TIMEOUT,
+            steps=commands
+        )
         
         return {
             'success': True,
-            'message': 'Entorno de desarrollo preparado exitosamente',
+            'message': 'Preparando entorno de desarrollo',
+            'install_job': job_id,
             'venv_path': '/home/phablet/.ubtool/venv',
             'python_path': '/home/phablet/.ubtool/venv/bin/python',
             'pip_path': '/home/phablet/.ubtool/venv/bin/pip'
@@ -666,25 +1233,24 @@ async def prepare_dev_environment(request):
         }
 
 
+VENV_STATUS_SCRIPT = (
+    "if test -d /home/phablet/.ubtool/venv; then "
+    "test -f /home/phablet/.ubtool/venv/bin/python && "
+    "test -f /home/phablet/.ubtool/venv/bin/pip && echo ready || echo incomplete; "
+    "else echo not_created; fi"
+)
+
 @app.route('/api/devtools/venv_status')
 async def venv_status(request):
     """API: Verificar estado del entorno virtual global"""
     try:
-        # Verificar si el directorio del venv global existe
-        check_cmd = "test -d /home/phablet/.ubtool/venv && echo 'exists' || echo 'not_exists'"
-        result = subprocess.run(['adb', 'shell', check_cmd], capture_output=True, text=True, timeout=10)
-        
-        if result.returncode == 0 and 'exists' in result.stdout:
-            # Verificar si python está disponible en el venv
-            python_check = "test -f /home/phablet/.ubtool/venv/bin/python && echo 'ready' || echo 'incomplete'"
-            python_result = subprocess.run(['adb', 'shell', python_check], capture_output=True, text=True, timeout=10)
-            
-            # Verificar si pip está disponible en el venv
-            pip_check = "test -f /home/phablet/.ubtool/venv/bin/pip && echo 'ready' || echo 'incomplete'"
-            pip_result = subprocess.run(['adb', 'shell', pip_check], capture_output=True, text=True, timeout=10)
-            
-            if python_result.returncode == 0 and 'ready' in python_result.stdout and pip_result.returncode == 0 and 'ready' in pip_result.stdout:
-                return json.dumps({
+        # Directorio, python y pip del venv global en una sola llamada
+        result = await adb_manager.run('shell', VENV_STATUS_SCRIPT, timeout=10)
+        status = result.stdout.strip()
+        
+        if status in ('ready', 'incomplete'):
+            if status == 'ready':
+                return json_response({
                     'success': True,
                     'status': 'ready',
                     'message': 'Entorno global listo para usar',
@@ -693,7 +1259,7 @@ async def venv_status(request):
                     'pip_path': '/home/phablet/.ubtool/venv/bin/pip'
                 })
             else:
-                return json.dumps({
+                return json_response({
                     'success': True,
                     'status': 'incomplete',
                     'message': 'Entorno global incompleto',
@@ -702,7 +1268,7 @@ async def venv_status(request):
                     'pip_path': '/home/phablet/.ubtool/venv/bin/pip'
                 })
         else:
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'status': 'not_created',
                 'message': 'Entorno global no creado',
@@ -712,7 +1278,7 @@ async def venv_status(request):
             })
             
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -724,30 +1290,33 @@ async def get_logs(request):
         app_name = request.args.get('app_name', '').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
         # Ruta del archivo de logs en el dispositivo
         log_file = f"/home/phablet/Apps/{app_name}/app.log"
         
         # Verificar si el archivo de logs existe
         check_cmd = f"test -f {log_file} && echo 'exists' || echo 'not_exists'"
-        check_result = subprocess.run(['adb', 'shell', check_cmd], capture_output=True, text=True, timeout=10)
+        check_result = await adb_manager.run('shell', check_cmd, timeout=10)
         
         if check_result.returncode == 0 and 'exists' in check_result.stdout:
             # Leer el contenido del archivo de logs
             read_cmd = f"tail -n 100 {log_file} 2>/dev/null || echo 'Error reading log file'"
-            read_result = subprocess.run(['adb', 'shell', read_cmd], capture_output=True, text=True, timeout=15)
+            read_result = await adb_manager.run('shell', read_cmd, timeout=15)
             
             # Obtener tamaño del archivo
             size_cmd = f"wc -c {log_file} 2>/dev/null | awk '{{print $1}}' || echo '0'"
-            size_result = subprocess.run(['adb', 'shell', size_cmd], capture_output=True, text=True, timeout=10)
+            size_result = await adb_manager.run('shell', size_cmd, timeout=10)
             
             file_size = size_result.stdout.strip() if size_result.returncode == 0 else 'N/A'
             
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'app_name': app_name,
                 'log_file': 'app.log',
@@ -756,7 +1325,7 @@ async def get_logs(request):
                 'lines_count': len(read_result.stdout.split('\n')) if read_result.stdout else 0
             })
         else:
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'app_name': app_name,
                 'log_file': 'app.log',
@@ -766,7 +1335,7 @@ async def get_logs(request):
             })
             
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': f'Error obteniendo logs: {str(e)}'
         })
@@ -778,23 +1347,25 @@ async def download_logs(request):
         app_name = request.args.get('app_name', '').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
         # Ruta del archivo de logs en el dispositivo
         log_file = f"/home/phablet/Apps/{app_name}/app.log"
         
         # Verificar si el archivo existe
         check_cmd = f"test -f {log_file}"
-        check_result = subprocess.run(['adb', 'shell', check_cmd], capture_output=True, text=True, timeout=10)
+        check_result = await adb_manager.run('shell', check_cmd, timeout=10)
         
         if check_result.returncode == 0:
             # Copiar el archivo de logs a un temporal local
             temp_file = f"/tmp/{app_name}_logs.txt"
-            copy_cmd = f"adb pull {log_file} {temp_file}"
-            copy_result = subprocess.run(copy_cmd.split(), timeout=30)
+            copy_result = await adb_manager.run('pull', log_file, temp_file, timeout=30)
             
             if copy_result.returncode == 0:
                 # Leer el contenido para devolverlo
@@ -802,28 +1373,26 @@ async def download_logs(request):
                     log_content = f.read()
                 
                 # Limpiar el archivo temporal
-                import os
                 os.remove(temp_file)
                 
-                from microdot import Response
                 return Response(
                     log_content,
                     mimetype='text/plain',
                     headers={'Content-Disposition': f'attachment; filename="{app_name}_logs.txt"'}
                 )
             else:
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': 'Error descargando archivo de logs'
                 })
         else:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': f'No se encontró el archivo de logs para {app_name}'
             })
             
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': f'Error descargando logs: {str(e)}'
         })
@@ -836,55 +1405,103 @@ async def clear_logs(request):
         app_name = data.get('app_name', '').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
         # Ruta del archivo de logs en el dispositivo
         log_file = f"/home/phablet/Apps/{app_name}/app.log"
         
         # Verificar si el archivo existe
         check_cmd = f"test -f {log_file}"
-        check_result = subprocess.run(['adb', 'shell', check_cmd], capture_output=True, text=True, timeout=10)
+        check_result = await adb_manager.run('shell', check_cmd, timeout=10)
         
         if check_result.returncode == 0:
             # Hacer backup del contenido actual
-            timestamp = subprocess.run(['date', '+%Y%m%d_%H%M%S'], capture_output=True, text=True).stdout.strip()
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
             backup_file = f"{log_file}.backup_{timestamp}"
             
             backup_cmd = f"cp {log_file} {backup_file} 2>/dev/null"
-            subprocess.run(['adb', 'shell', backup_cmd], timeout=10)
+            await adb_manager.run('shell', backup_cmd, timeout=10)
             
             # Limpiar el archivo de logs
             clear_cmd = f"echo '# Logs limpiados el {timestamp}' > {log_file}"
-            clear_result = subprocess.run(['adb', 'shell', clear_cmd], capture_output=True, text=True, timeout=10)
+            clear_result = await adb_manager.run('shell', clear_cmd, timeout=10)
             
             if clear_result.returncode == 0:
-                return json.dumps({
+                return json_response({
                     'success': True,
                     'message': f'Logs de {app_name} limpiados exitosamente',
                     'backup_file': f'app.log.backup_{timestamp}',
                     'timestamp': timestamp
                 })
             else:
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': 'Error limpiando archivo de logs'
                 })
         else:
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'message': f'No existía archivo de logs para {app_name}',
                 'action': 'no_action_needed'
             })
             
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': f'Error limpiando logs: {str(e)}'
         })
 
+SIZE_UNITS = ('Bytes', 'KiB', 'MiB', 'GiB', 'TiB', 'PiB', 'EiB')
+
+
+def human_size(size):
+    """Tamaño legible en unidades binarias (formato de humanize.naturalsize)"""
+    if size == 1:
+        return '1 Byte'
+    if size < 1024:
+        return f'{size} Bytes'
+    exp = min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+    value = f'{size / (1 << (10 * exp)):.1f}'
+    # Just below a boundary the mantissa rounds up to 1024.0: step up a unit
+    # so it reads "1.0 GiB" rather than "1024.0 MiB"
+    if float(value) >= 1024 and exp < len(SIZE_UNITS) - 1:
+        exp += 1
+        value = f'{size / (1 << (10 * exp)):.1f}'
+    return f'{value} {SIZE_UNITS[exp]}'
+
+
+# One NUL-terminated "type<TAB>size<TAB>mtime<TAB>name" record per entry;
+# a shell one-liner instead of starting python3 on the phone
+FILE_LIST_SCRIPT = (
+    "p={path}; "
+    "[ -d \"$p\" ] || {{ echo \"No es un directorio: $p\" >&2; exit 1; }}; "
+    "find \"$p\" -mindepth 1 -maxdepth 1 -printf '%y\\t%s\\t%T@\\t%f\\0'"
+)
+
+
+def parse_file_list(output):
+    """Convierte la salida de FILE_LIST_SCRIPT en entradas del File Manager"""
+    entries = []
+    for record in output.split('\0'):
+        parts = record.split('\t', 3)
+        if len(parts) < 4:
+            continue
+        kind, size, mtime, name = parts
+        try:
+            size = int(size)
+            mtime = int(float(mtime))
+        except ValueError:
+            size = mtime = None
+        entries.append({'name': name, 'is_dir': kind == 'd', 'size': size, 'mtime': mtime})
+    return entries
+
+
 @app.route('/api/files/list')
 async def list_device_files(request):
     """API: Listar archivos del dispositivo (File Manager)."""
@@ -892,137 +1509,54 @@ async def list_device_files(request):
         if not adb_manager.is_available():
             return {'success': False, 'error': 'ADB no disponible'}
 
-        devices = adb_manager.get_devices()
+        devices = await adb_manager.get_devices()
         if not devices:
             return {'success': False, 'error': 'No hay dispositivos conectados'}
 
         device_id = devices[0]['id']
 
-        qs = getattr(request, 'query_string', b'')
-        if isinstance(qs, (bytes, bytearray)):
-            qs = qs.decode('utf-8', errors='ignore')
-        params = urllib.parse.parse_qs(qs or '')
-        path = (params.get('path', [None])[0] or '/home/phablet').strip()
+        path = (request.args.get('path') or '/home/phablet').strip()
         if not path.startswith('/'):
             path = '/' + path
+        # Device paths are POSIX whatever the host OS is
+        path = posixpath.normpath(path)
 
-        adb_bin = adb_manager.adb_path or 'adb'
-
-        py_code = (
-            "import os,sys,json\n"
-            "p=sys.argv[1] if len(sys.argv)>1 else '/home/phablet'\n"
-            "p=os.path.normpath(p)\n"
-            "out={'path':p,'parent':os.path.dirname(p) if p!='/' else None,'entries':[]}\n"
-            "try:\n"
-            "  with os.scandir(p) as it:\n"
-            "    for e in it:\n"
-            "      try:\n"
-            "        st=e.stat(follow_symlinks=False)\n"
-            "        size=int(st.st_size)\n"
-            "        mtime=int(st.st_mtime)\n"
-            "      except Exception:\n"
-            "        size=None; mtime=None\n"
-            "      out['entries'].append({'name':e.name,'is_dir':e.is_dir(follow_symlinks=False),'size':size,'mtime':mtime})\n"
-            "  out['entries'].sort(key=lambda x:(not x.get('is_dir',False), x.get('name','').lower()))\n"
-            "  print(json.dumps(out))\n"
-            "except Exception as ex:\n"
-            "  print(json.dumps({'error':str(ex),'path':p}), end='')\n"
-        )
+        # Optional window (?offset=&limit=); without them, the whole directory
+        try:
+            offset = max(0, int(request.args.get('offset') or 0))
+            limit = request.args.get('limit')
+            limit = max(0, int(limit)) if limit else None
+        except ValueError:
+            return {'success': False, 'error': 'offset/limit inválidos'}
 
-        result = subprocess.run(
-            [adb_bin, '-s', device_id, 'shell', 'python3', '-c', py_code, path],
-            capture_output=True,
-            text=True,
+        safe_path = shlex.quote(path)
+        result = await adb_manager.run(
+            '-s', device_id, 'shell', FILE_LIST_SCRIPT.format(path=safe_path),
             timeout=20
         )
 
         if result.returncode != 0:
             return {
                 'success': False,
-                'error': (result.stderr or result.stdout or '').strip() or 'Error al listar archivos'
+                'error': (result.stderr or result.stdout or '').strip() or 'Error al listar archivos',
+                'path': path
             }
 
-        raw = (result.stdout or '').strip()
-        if raw:
-            try:
-                data = json.loads(raw)
-                if isinstance(data, dict) and data.get('error'):
-                    return {'success': False, 'error': data.get('error'), 'path': data.get('path')}
-
-                # Add human readable sizes
-                for e in data.get('entries', []) if isinstance(data, dict) else []:
-                    sz = e.get('size')
-                    if sz is None:
-                        e['size_human'] = None
-                    else:
-                        if humanize:
-                            e['size_human'] = humanize.naturalsize(sz, binary=True)
-                        else:
-                            e['size_human'] = str(sz)
-
-                return {'success': True, 'data': data}
-            except Exception:
-                # Fall through to ls fallback
-                pass
-
-        # If python3 produced no usable output, try to surface stderr and fallback to ls
-        stderr = (result.stderr or '').strip()
-
-        safe_path = path.replace("'", "'\\''")
-        ls_cmd = (
-            f"p='{safe_path}'; "
-            "ls -la \"$p\" 2>/dev/null || ls -la 2>/dev/null"
-        )
-        ls = subprocess.run(
-            [adb_bin, '-s', device_id, 'shell', ls_cmd],
-            capture_output=True,
-            text=True,
-            timeout=20
-        )
-
-        ls_out = (ls.stdout or '').splitlines()
-        if not ls_out:
-            err = (ls.stderr or stderr or '').strip() or 'Respuesta vacía del dispositivo'
-            return {'success': False, 'error': err}
-
-        entries = []
-        for line in ls_out:
-            line = line.rstrip('\n')
-            if not line or line.startswith('total'):
-                continue
-            parts = line.split(None, 8)
-            if len(parts) < 9:
-                continue
-            mode = parts[0]
-            name = parts[8]
-            try:
-                size = int(parts[4])
-            except Exception:
-                size = None
-            is_dir = mode.startswith('d')
-            if name in {'.', '..'}:
-                continue
-            item = {
-                'name': name,
-                'is_dir': is_dir,
-                'size': size,
-                'mtime': None
-            }
-            if size is not None:
-                item['size_human'] = humanize.naturalsize(size, binary=True) if humanize else str(size)
-            else:
-                item['size_human'] = None
-            entries.append(item)
+        entries = parse_file_list(result.stdout)
+        entries.sort(key=lambda e: (not e['is_dir'], e['name'].lower()))
+        window = entries[offset:] if limit is None else entries[offset:offset + limit]
+        # Only the entries actually sent get a formatted size
+        for e in window:
+            e['size_human'] = None if e['size'] is None else human_size(e['size'])
 
         payload = {
             'path': path,
-            'parent': os.path.dirname(path) if path != '/' else None,
-            'entries': entries
+            'parent': posixpath.dirname(path) if path != '/' else None,
+            'entries': window,
+            'total': len(entries),
+            'offset': offset
         }
 
-        if stderr:
-            payload['warning'] = stderr
-
         return {'success': True, 'data': payload}
     except subprocess.TimeoutExpired:
         return {'success': False, 'error': 'Timeout al listar archivos'}
@@ -1030,53 +1564,71 @@ async def list_device_files(request):
         return {'success': False, 'error': str(e)}
 
 
+# Size on the first line, then the file itself (for exec-out, no PTY)
+FILE_READ_SCRIPT = (
+    "p={path}; "
+    "if [ -f \"$p\" ] && [ -r \"$p\" ] && s=$(stat -c %s \"$p\"); then "
+    "echo \"$s\"; exec head -c \"$s\" \"$p\"; "
+    "else echo \"No se puede leer: $p\"; fi"
+)
+
+
 @app.route('/api/files/raw')
 async def get_device_file_raw(request):
     """API: Obtener archivo del dispositivo como binario (viewer/descarga)."""
     try:
-        from microdot import Response
-
         if not adb_manager.is_available():
             return Response(b'ADB no disponible', status_code=400)
 
-        devices = adb_manager.get_devices()
+        devices = await adb_manager.get_devices()
         if not devices:
             return Response(b'No hay dispositivos conectados', status_code=400)
 
         device_id = devices[0]['id']
 
-        qs = getattr(request, 'query_string', b'')
-        if isinstance(qs, (bytes, bytearray)):
-            qs = qs.decode('utf-8', errors='ignore')
-        params = urllib.parse.parse_qs(qs or '')
-        path = (params.get('path', [None])[0] or '').strip()
+        path = (request.args.get('path') or '').strip()
         if not path:
             return Response(b'path requerido', status_code=400)
 
-        adb_bin = adb_manager.adb_path or 'adb'
-
-        safe_path = path.replace("'", "'\\''")
-        cat_cmd = f"cat '{safe_path}'"
-        result = subprocess.run(
-            [adb_bin, '-s', device_id, 'exec-out', 'sh', '-c', cat_cmd],
-            capture_output=True,
-            timeout=30
+        safe_path = shlex.quote(path)
+        proc, chunks = await adb_manager.stream(
+            '-s', device_id, 'exec-out', FILE_READ_SCRIPT.format(path=safe_path)
         )
-
-        if result.returncode != 0:
-            msg = (result.stderr or b'').strip() or b'Error al leer archivo'
+        try:
+            # First line is the size (or the error), the raw bytes follow
+            header = await asyncio.wait_for(proc.stdout.readline(), timeout=30)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(path, 30)
+        
+        if not header.strip().isdigit():
+            # The script already exited after printing the error
+            await proc.wait()
+            msg = header.strip() or b'Error al leer archivo'
             return Response(msg, status_code=404)
 
-        content_type, _ = mimetypes.guess_type(path)
-        if not content_type:
-            content_type = 'application/octet-stream'
+        headers = {
+            'Content-Type': guess_mime(path) or 'application/octet-stream',
+            # head -c in the script never sends more than this, even if the
+            # file grows while it is read
+            'Content-Length': header.strip().decode()
+        }
+        if request.method == 'HEAD':
+            # Microdot never iterates the body of a HEAD response, so the
+            # generator's cleanup wouldn't run either
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+            return Response(b'', headers=headers)
 
-        return Response(result.stdout or b'', headers={'Content-Type': content_type})
+        # Streamed as adb produces it: constant memory whatever the file size
+        return Response(chunks, headers=headers)
     except subprocess.TimeoutExpired:
-        from microdot import Response
         return Response(b'Timeout al leer archivo', status_code=408)
     except Exception as e:
-        from microdot import Response
         return Response(str(e).encode('utf-8', errors='ignore'), status_code=500)
 
 
@@ -1087,30 +1639,26 @@ async def get_device_file_text(request):
         if not adb_manager.is_available():
             return {'success': False, 'error': 'ADB no disponible'}
 
-        devices = adb_manager.get_devices()
+        devices = await adb_manager.get_devices()
         if not devices:
             return {'success': False, 'error': 'No hay dispositivos conectados'}
 
         device_id = devices[0]['id']
 
-        qs = getattr(request, 'query_string', b'')
-        if isinstance(qs, (bytes, bytearray)):
-            qs = qs.decode('utf-8', errors='ignore')
-        params = urllib.parse.parse_qs(qs or '')
-        path = (params.get('path', [None])[0] or '').strip()
+        path = (request.args.get('path') or '').strip()
         if not path:
             return {'success': False, 'error': 'path requerido'}
 
         # size limit (bytes)
         max_bytes = 200_000
 
-        adb_bin = adb_manager.adb_path or 'adb'
-        safe_path = path.replace("'", "'\\''")
-        cmd = f"cat '{safe_path}'"
-        result = subprocess.run(
-            [adb_bin, '-s', device_id, 'exec-out', 'sh', '-c', cmd],
-            capture_output=True,
-            timeout=20
+        safe_path = shlex.quote(path)
+        # One byte past the limit is enough to tell the file is too big
+        cmd = f"head -c {max_bytes + 1} {safe_path}"
+        result = await adb_manager.run(
+            '-s', device_id, 'exec-out', cmd,
+            timeout=20,
+            text=False
         )
 
         if result.returncode != 0:
@@ -1122,8 +1670,7 @@ async def get_device_file_text(request):
             return {'success': False, 'error': f'Archivo demasiado grande para editar (>{max_bytes} bytes)'}
 
         text = data.decode('utf-8', errors='replace')
-        mime, _ = mimetypes.guess_type(path)
-        return {'success': True, 'path': path, 'mime': mime or 'text/plain', 'content': text}
+        return {'success': True, 'path': path, 'mime': guess_mime(path) or 'text/plain', 'content': text}
     except subprocess.TimeoutExpired:
         return {'success': False, 'error': 'Timeout al leer archivo'}
     except Exception as e:
@@ -1134,14 +1681,6 @@ async def get_device_file_text(request):
 async def write_device_file_text(request):
     """API: Guardar archivo de texto en el dispositivo."""
     try:
-        if not adb_manager.is_available():
-            return {'success': False, 'error': 'ADB no disponible'}
-
-        devices = adb_manager.get_devices()
-        if not devices:
-            return {'success': False, 'error': 'No hay dispositivos conectados'}
-
-        device_id = devices[0]['id']
         payload = request.json or {}
         path = (payload.get('path') or '').strip()
         content = payload.get('content')
@@ -1150,21 +1689,32 @@ async def write_device_file_text(request):
         if content is None:
             return {'success': False, 'error': 'content requerido'}
 
+        # Every character is at least one UTF-8 byte: oversize text is
+        # rejected before encoding it or asking adb for devices
+        if len(content) > 200_000:
+            return {'success': False, 'error': 'Contenido demasiado grande'}
         raw = content.encode('utf-8')
         if len(raw) > 200_000:
             return {'success': False, 'error': 'Contenido demasiado grande'}
 
-        b64 = base64.b64encode(raw).decode('ascii')
-        adb_bin = adb_manager.adb_path or 'adb'
-        safe_path = path.replace("'", "'\\''")
-
-        # Requires base64 on device
-        cmd = f"printf %s '{b64}' | base64 -d > '{safe_path}'"
-        result = subprocess.run(
-            [adb_bin, '-s', device_id, 'shell', 'sh', '-c', cmd],
-            capture_output=True,
-            text=True,
-            timeout=20
+        if not adb_manager.is_available():
+            return {'success': False, 'error': 'ADB no disponible'}
+
+        devices = await adb_manager.get_devices()
+        if not devices:
+            return {'success': False, 'error': 'No hay dispositivos conectados'}
+
+        device_id = devices[0]['id']
+
+        # Raw bytes over stdin: no base64 round-trip and no size limit on the
+        # command line. exec-in (the input twin of exec-out) passes stdin's
+        # EOF on to the device; `adb shell` only does that with shell v2,
+        # so `cat` would never return on older adbd. `cat >` keeps the
+        # mode of an existing file
+        result = await adb_manager.run(
+            '-s', device_id, 'exec-in', f"cat > {shlex.quote(path)}",
+            timeout=20,
+            input=raw
         )
 
         if result.returncode != 0:
@@ -1178,191 +1728,29 @@ async def write_device_file_text(request):
         return {'success': False, 'error': str(e)}
 
 
-@app.route('/api/devtools/prepare_env', methods=['POST'])
-def prepare_dev_environment(request):
-    """Preparar entorno de desarrollo en el dispositivo (python3/pip/virtualenv)."""
-    try:
-        adb_bin = adb_manager.adb_path or 'adb'
-
-        global_venv_dir = '/home/phablet/.ubtool/venv'
-        global_venv_pip = f'{global_venv_dir}/bin/pip'
-
-        def run_shell(cmd, timeout=60):
-            return subprocess.run([adb_bin, 'shell', cmd], capture_output=True, text=True, timeout=timeout)
-
-        details = {
-            'python': {'available': False, 'version': None},
-            'pip': {'available': False, 'version': None},
-            'virtualenv': {'available': False},
-            'actions': []
-        }
-
-        py = run_shell('python3 --version', timeout=15)
-        if py.returncode == 0 and (py.stdout or py.stderr):
-            details['python']['available'] = True
-            details['python']['version'] = (py.stdout or py.stderr).strip()
-        else:
-            return json.dumps({
-                'success': False,
-                'error': 'python3 no disponible en el dispositivo',
-                'details': details
-            })
-
-        # pip: prefer python3 -m pip
-        pip = run_shell('python3 -m pip --version', timeout=20)
-        if pip.returncode == 0 and (pip.stdout or pip.stderr):
-            details['pip']['available'] = True
-            details['pip']['version'] = (pip.stdout or pip.stderr).strip()
-        else:
-            # try ensurepip (may not exist on all builds)
-            ensure = run_shell('python3 -m ensurepip --user', timeout=60)
-            details['actions'].append({
-                'step': 'ensurepip',
-                'return_code': ensure.returncode,
-                'stdout': (ensure.stdout or '').strip(),
-                'stderr': (ensure.stderr or '').strip()
-            })
-
-            pip = run_shell('python3 -m pip --version', timeout=20)
-            if pip.returncode == 0 and (pip.stdout or pip.stderr):
-                details['pip']['available'] = True
-                details['pip']['version'] = (pip.stdout or pip.stderr).strip()
-
-        if not details['pip']['available']:
-            return json.dumps({
-                'success': False,
-                'error': 'pip no disponible (python3 -m pip falla y ensurepip no funcionó)',
-                'details': details
-            })
-
-        # Upgrade pip/setuptools/wheel (best effort)
-        up = run_shell('python3 -m pip install --user -U pip setuptools wheel', timeout=180)
-        details['actions'].append({
-            'step': 'upgrade_pip',
-            'return_code': up.returncode,
-            'stdout': (up.stdout or '').strip(),
-            'stderr': (up.stderr or '').strip()
-        })
-
-        # virtualenv
-        venv_check = run_shell('python3 -m virtualenv --version', timeout=15)
-        if venv_check.returncode == 0:
-            details['virtualenv']['available'] = True
-        else:
-            inst = run_shell('python3 -m pip install --user virtualenv', timeout=180)
-            details['actions'].append({
-                'step': 'install_virtualenv',
-                'return_code': inst.returncode,
-                'stdout': (inst.stdout or '').strip(),
-                'stderr': (inst.stderr or '').strip()
-            })
-
-            venv_check = run_shell('python3 -m virtualenv --version', timeout=15)
-            details['virtualenv']['available'] = venv_check.returncode == 0
-
-        if not details['virtualenv']['available']:
-            return json.dumps({
-                'success': False,
-                'error': 'virtualenv no se pudo instalar/verificar',
-                'details': details
-            })
-
-        # Global venv (shared across all webapps)
-        mk = run_shell("mkdir -p /home/phablet/.ubtool", timeout=20)
-        details['actions'].append({
-            'step': 'mkdir_global_dir',
-            'return_code': mk.returncode,
-            'stdout': (mk.stdout or '').strip(),
-            'stderr': (mk.stderr or '').strip()
-        })
-
-        # Create venv if it does not exist
-        venv_exists = run_shell(f"test -x {global_venv_dir}/bin/python && echo yes || echo no", timeout=10)
-        if (venv_exists.stdout or '').strip() != 'yes':
-            mkvenv = run_shell(f"python3 -m virtualenv {global_venv_dir}", timeout=180)
-            details['actions'].append({
-                'step': 'create_global_venv',
-                'return_code': mkvenv.returncode,
-                'stdout': (mkvenv.stdout or '').strip(),
-                'stderr': (mkvenv.stderr or '').strip()
-            })
-            if mkvenv.returncode != 0:
-                return json.dumps({
-                    'success': False,
-                    'error': 'No se pudo crear el entorno virtual global',
-                    'details': details
-                })
-
-        # Upgrade pip/setuptools/wheel inside venv
-        up_venv = run_shell(f"{global_venv_pip} install -U pip setuptools wheel", timeout=180)
-        details['actions'].append({
-            'step': 'upgrade_global_venv_pip',
-            'return_code': up_venv.returncode,
-            'stdout': (up_venv.stdout or '').strip(),
-            'stderr': (up_venv.stderr or '').strip()
-        })
-
-        # Install shared frameworks (best effort)
-        install_fw = run_shell(f"{global_venv_pip} install -U microdot jinja2 flask gunicorn flask-cors fastapi uvicorn[standard]", timeout=300)
-        details['actions'].append({
-            'step': 'install_frameworks_global_venv',
-            'return_code': install_fw.returncode,
-            'stdout': (install_fw.stdout or '').strip(),
-            'stderr': (install_fw.stderr or '').strip()
-        })
-
-        return json.dumps({
-            'success': True,
-            'message': 'Entorno listo (python3/pip/virtualenv + venv global)',
-            'details': details,
-            'global_venv': global_venv_dir
-        })
-    except Exception as e:
-        return json.dumps({
-            'success': False,
-            'error': str(e)
-        })
-
 @app.route('/api/devtools/check', methods=['GET'])
-def check_dev_tools(request):
+async def check_dev_tools(request):
     """Verificar disponibilidad de herramientas de desarrollo en el dispositivo"""
     try:
-        # Verificar Python
-        python_check = subprocess.run(
-            ['adb', 'shell', 'python3 --version'],
-            capture_output=True, text=True, timeout=10
-        )
-        python_version = python_check.stdout.strip() if python_check.returncode == 0 else None
-        
-        # Verificar pip
-        pip_check = subprocess.run(
-            ['adb', 'shell', 'pip3 --version'],
-            capture_output=True, text=True, timeout=10
-        )
-        pip_version = pip_check.stdout.strip() if pip_check.returncode == 0 else None
-        
-        # Verificar virtualenv
-        venv_check = subprocess.run(
-            ['adb', 'shell', 'which virtualenv'],
-            capture_output=True, text=True, timeout=10
-        )
-        virtualenv_path = venv_check.stdout.strip() if venv_check.returncode == 0 else None
-        
-        # Verificar espacio disponible
-        space_check = subprocess.run(
-            ['adb', 'shell', "df -h /home/phablet | tail -1 | awk '{print $4}'"],
-            capture_output=True, text=True, timeout=10
-        )
-        available_space = space_check.stdout.strip() if space_check.returncode == 0 else None
-        
-        # Verificar memoria
-        memory_check = subprocess.run(
-            ['adb', 'shell', "free -h | grep '^Mem:' | awk '{print $7}'"],
-            capture_output=True, text=True, timeout=10
-        )
-        available_memory = memory_check.stdout.strip() if memory_check.returncode == 0 else None
+        devices = await adb_manager.get_devices()
+        if not devices:
+            return json_response({
+                'success': False,
+                'error': 'No hay dispositivos conectados'
+            })
         
-        return json.dumps({
+        # python3, pip3, virtualenv, disk and memory in one command on the
+        # device's persistent shell
+        result = await adb_manager.shell(devices[0]['id'], DEV_TOOLS_CHECK_SCRIPT, timeout=15)
+        sections = split_sections(result.stdout)
+        found = {key: value.strip() or None for key, value in sections.items()}
+        python_version = found.get('python')
+        pip_version = found.get('pip')
+        virtualenv_path = found.get('virtualenv')
+        available_space = found.get('disk_space')
+        available_memory = found.get('memory')
+        
+        return json_response({
             'success': True,
             'tools': {
                 'python': {
@@ -1384,7 +1772,7 @@ def check_dev_tools(request):
             }
         })
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -1909,13 +2297,113 @@ if __name__ == '__main__':
 '''
     return content
 
+# Background jobs started by create_env (pip install) and prepare_env:
+# job_id -> state
+INSTALL_JOBS = {}
+# Finished jobs are forgotten after this many seconds
+INSTALL_JOB_TTL = 3600
+# Tail of pip's output kept per job (characters)
+INSTALL_JOB_OUTPUT_CHARS = 4000
+# Upper bound for one pip run on the device (seconds)
+INSTALL_JOB_TIMEOUT = 600
+# Last queued job (each job waits for the previous one) and strong refs to
+# the running tasks
+_install_tail = None
+_install_tasks = set()
+
+
+def start_install_job(app_name, device_id, command, timeout=INSTALL_JOB_TIMEOUT, steps=None):
+    """Encola `command` en el dispositivo y devuelve su job_id.
+
+    Los trabajos corren de uno en uno: todos instalan en el mismo venv global.
+    Con ``steps`` el comando es una cadena que imprime PREPARE_STEP_MARKER
+    tras cada paso, y un fallo se atribuye al paso que no llegó a terminar.
+    """
+    global _install_tail
+    now = time.time()
+    for job_id in [j for j, job in INSTALL_JOBS.items()
+                   if job['finished_at'] and now - job['finished_at'] > INSTALL_JOB_TTL]:
+        del INSTALL_JOBS[job_id]
+    
+    job_id = uuid.uuid4().hex[:12]
+    INSTALL_JOBS[job_id] = {
+        'app_name': app_name,
+        'state': 'queued',
+        'return_code': None,
+        'output': '',
+        'error': None,
+        'queued_at': now,
+        'started_at': None,
+        'finished_at': None
+    }
+    task = asyncio.ensure_future(
+        _run_install_job(job_id, device_id, command, _install_tail, timeout, steps)
+    )
+    _install_tasks.add(task)
+    task.add_done_callback(_install_tasks.discard)
+    _install_tail = task
+    return job_id
+
+
+async def _run_install_job(job_id, device_id, command, previous, timeout, steps):
+    job = INSTALL_JOBS[job_id]
+    proc = None
+    try:
+        if previous is not None:
+            # Whatever the previous job ended with, this one goes next
+            await asyncio.wait([previous])
+        job['state'] = 'running'
+        job['started_at'] = time.time()
+        # Plain asyncio subprocess rather than adb_manager.run: a pip run
+        # would hold one of the adb slots for minutes
+        proc = await asyncio.create_subprocess_exec(
+            adb_manager.adb_path or 'adb', '-s', device_id, 'shell', command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        output, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        output = output.decode('utf-8', errors='replace')
+        job['return_code'] = proc.returncode
+        job['state'] = 'done' if proc.returncode == 0 else 'error'
+        if steps:
+            done = output.count(PREPARE_STEP_MARKER)
+            if done < len(steps):
+                job['state'] = 'error'
+                job['error'] = f'Error en comando: {steps[min(done, len(steps) - 1)]}'
+            output = output.replace(f'{PREPARE_STEP_MARKER}\n', '')
+        job['output'] = output[-INSTALL_JOB_OUTPUT_CHARS:]
+    except asyncio.CancelledError:
+        # Server shutting down: don't leave adb/pip running behind us
+        job['output'] = 'Instalación cancelada'
+        job['state'] = 'error'
+        raise
+    except asyncio.TimeoutError:
+        job['output'] = 'Timeout instalando paquetes'
+        job['state'] = 'error'
+    except Exception as e:
+        job['output'] = str(e)
+        job['state'] = 'error'
+    finally:
+        if proc is not None and proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        job['finished_at'] = time.time()
+
+
+@app.route('/api/devtools/install_status')
+async def install_status(request):
+    """API: Estado de una instalación en segundo plano (create_env, prepare_env)"""
+    job = INSTALL_JOBS.get(request.args.get('job_id', ''))
+    if job is None:
+        return json_response({'success': False, 'error': 'Instalación no encontrada'})
+    return json_response({'success': True, **job})
+
+
 @app.route('/api/devtools/create_env', methods=['POST'])
-def create_virtual_env(request):
+@with_form_data
+async def create_virtual_env(request):
     """Crear app web usando un entorno virtual global (compartido)."""
     try:
-        # Import configuration
-        import config
-        
         # Handle both JSON and FormData requests
         app_name = None
         framework = 'microdot'
@@ -1938,19 +2426,22 @@ def create_virtual_env(request):
             framework = data.get('framework', 'microdot').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
         # Validar nombre de app
-        if not re.match(r'^[a-zA-Z0-9_-]+$', app_name):
-            return json.dumps({
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
+        devices = await adb_manager.get_devices()
+        if not devices:
+            return json_response({
                 'success': False,
-                'error': 'Nombre de app inválido. Solo letras, números, guiones y guiones bajos'
+                'error': 'No hay dispositivos conectados'
             })
-        
-        adb_bin = adb_manager.adb_path or 'adb'
+        device_id = devices[0]['id']
         
         # Use configuration from config.py
         global_venv_python = config.GLOBAL_VENV_PYTHON
@@ -1958,24 +2449,18 @@ def create_virtual_env(request):
         app_path = f"{config.APPS_BASE_PATH}/{app_name}"
 
         # Ensure global venv exists
-        chk = subprocess.run(
-            [adb_bin, 'shell', f"test -x {global_venv_python}"],
-            capture_output=True, text=True, timeout=10
-        )
+        chk = await adb_manager.run('-s', device_id, 'shell', f"test -x {global_venv_python}", timeout=10)
         if chk.returncode != 0:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Entorno global no encontrado. Ejecuta primero: Preparar entorno',
                 'global_venv': config.GLOBAL_VENV_PATH
             })
 
+        # Whole directory tree in one call (-p creates the parents)
         commands = [
-            f"mkdir -p {app_path}",
-            f"mkdir -p {app_path}/static",
-            f"mkdir -p {app_path}/static/css", 
-            f"mkdir -p {app_path}/static/js",
-            f"mkdir -p {app_path}/static/images",
-            f"mkdir -p {app_path}/templates",
+            f"mkdir -p {app_path}/static/css {app_path}/static/js "
+            f"{app_path}/static/images {app_path}/templates"
         ]
 
         # Create basic static files
@@ -2024,44 +2509,14 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 '''
 
-        # Create static files
-        commands.extend([
-            f"echo '{css_content}' > {app_path}/static/css/style.css",
-            f"echo '{js_content}' > {app_path}/static/js/app.js",
-        ])
-
-        # Handle icon file upload
+        # Uploaded icon, pushed together with the generated files
+        icon = None
         if icon_file:
             try:
-                # Read file content and save to device
-                icon_content = icon_file.read()
-                icon_filename = icon_file.filename or 'icon.png'
-                icon_path = f"{app_path}/static/images/{icon_filename}"
-                
-                # Create a temporary file and push it to device
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                    temp_file.write(icon_content)
-                    temp_file_path = temp_file.name
-                
-                # Create images directory and push file to device
-                mkdir_cmd = f"mkdir -p {app_path}/static/images"
-                subprocess.run([adb_bin, 'shell', mkdir_cmd], timeout=10)
-                
-                push_result = subprocess.run([
-                    adb_bin, 'push', temp_file_path, icon_path
-                ], capture_output=True, text=True, timeout=30)
-                
-                # Clean up temp file
-                os.unlink(temp_file_path)
-                
-                if push_result.returncode != 0:
-                    print(f"Warning: Failed to upload icon: {push_result.stderr}")
-                else:
-                    print(f"Icon uploaded successfully: {icon_path}")
-                    
+                icon_filename = os.path.basename(icon_file.filename or '') or 'icon.png'
+                icon = (icon_filename, await icon_file.read())
             except Exception as e:
-                print(f"Warning: Error processing icon file: {e}")
+                logger.warning("Error processing icon file: %s", e)
                 # Continue without icon if upload fails
 
         # Create basic template
@@ -2108,10 +2563,7 @@ document.addEventListener('DOMContentLoaded', function() {
 </body>
 </html>'''
         
-        # Create template file
-        commands.append(f"echo '{template_content}' > {app_path}/templates/index.html")
-
-        # Create framework-specific app.py using line-by-line echo approach
+        # Create framework-specific app.py
         if framework == 'microdot':
             app_py_content = get_microdot_app_content(app_name, framework, app_path, global_venv_python)
         elif framework == 'flask':
@@ -2121,48 +2573,7 @@ document.addEventListener('DOMContentLoaded', function() {
         else:
             app_py_content = get_microdot_app_content(app_name, framework, app_path, global_venv_python)
         
-        # Create app.py using adb push method
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.py') as temp_file:
-            temp_file.write(app_py_content.encode('utf-8'))
-            temp_file_path = temp_file.name
-        
-        # Push the file to device
-        push_result = subprocess.run([
-            adb_bin, 'push', temp_file_path, f"{app_path}/app.py"
-        ], capture_output=True, text=True, timeout=30)
-        
-        # Clean up temp file
-        os.unlink(temp_file_path)
-        
-        # Make it executable
-        commands.append(f"chmod +x {app_path}/app.py")
-        
-        if push_result.returncode != 0:
-            print(f"Warning: Failed to push app.py: {push_result.stderr}")
-            # Fallback to echo method
-            commands.append(f"echo '#!/usr/bin/env python3' > {app_path}/app.py")
-            commands.append(f"echo 'from microdot import Microdot' >> {app_path}/app.py")
-            commands.append(f"echo 'app = Microdot()' >> {app_path}/app.py")
-            commands.append(f"echo 'app.run(host=\"0.0.0.0\", port=8081)' >> {app_path}/app.py")
-            commands.append(f"chmod +x {app_path}/app.py")
         framework_packages = config.FRAMEWORK_PACKAGES.get(framework, [])
-        if framework_packages:
-            packages_str = " ".join(framework_packages)
-            commands.append(f"{global_venv_pip} install -U {packages_str}")
-        
-        # Ejecutar comandos
-        for cmd in commands:
-            result = subprocess.run(
-                [adb_bin, 'shell', cmd],
-                capture_output=True, text=True, timeout=180
-            )
-            if result.returncode != 0:
-                return json.dumps({
-                    'success': False,
-                    'error': f'Error en comando: {cmd}',
-                    'details': (result.stderr or result.stdout)
-                })
         
         # Crear archivo de configuración usando config
         config_content = f'''# App Configuration
@@ -2179,118 +2590,164 @@ GLOBAL_VENV_PYTHON = "{config.GLOBAL_VENV_PYTHON}"
 REQUIRED_PACKAGES = {framework_packages}
 '''
         
-        config_cmd = f"echo '{config_content}' > {app_path}/config.py"
-        subprocess.run([adb_bin, 'shell', config_cmd], timeout=10)
+        async def run_commands(cmds):
+            """Ejecuta los comandos en orden; devuelve el error del primero que falle"""
+            for cmd in cmds:
+                result = await adb_manager.run('-s', device_id, 'shell', cmd, timeout=180)
+                if result.returncode != 0:
+                    return json_response({
+                        'success': False,
+                        'error': f'Error en comando: {cmd}',
+                        'details': output_tail(result.stderr or result.stdout)
+                    })
+            return None
+        
+        # Ejecutar comandos
+        error = await run_commands(commands)
+        if error:
+            return error
+        
+        # Generated files are staged in a local tree and sent with a single
+        # `adb push`: their contents never go through shell quoting or argv
+        staged_files = {
+            'static/css/style.css': css_content,
+            'static/js/app.js': js_content,
+            'templates/index.html': template_content,
+            'app.py': app_py_content,
+            'config.py': config_content
+        }
+        with tempfile.TemporaryDirectory(prefix='ubtool-app-') as stage:
+            for rel_path, content in staged_files.items():
+                local_path = os.path.join(stage, *rel_path.split('/'))
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                with open(local_path, 'w', encoding='utf-8', newline='\n') as f:
+                    f.write(content)
+            if icon:
+                images_dir = os.path.join(stage, 'static', 'images')
+                os.makedirs(images_dir, exist_ok=True)
+                with open(os.path.join(images_dir, icon[0]), 'wb') as f:
+                    f.write(icon[1])
+            
+            push_result = await adb_manager.run(
+                '-s', device_id, 'push', *(os.path.join(stage, name) for name in ('static', 'templates', 'app.py', 'config.py')), app_path,
+                timeout=60
+            )
+        if push_result.returncode != 0:
+            return json_response({
+                'success': False,
+                'error': 'Error copiando los archivos de la app al dispositivo',
+                'details': output_tail(push_result.stderr or push_result.stdout)
+            })
+        
+        # Make it executable
+        error = await run_commands([f"chmod +x {app_path}/app.py"])
+        if error:
+            return error
+        
+        next_steps = [
+            f'Crea tu app en {app_path}/app.py',
+            f'Python: {global_venv_python}',
+            f'Inicia el servidor: cd {app_path} && {global_venv_python} app.py'
+        ]
         
-        return json.dumps({
+        # The framework upgrade is by far the slowest step: it runs in the
+        # background and can be followed through /api/devtools/install_status
+        install_job = None
+        if framework_packages:
+            packages_str = " ".join(framework_packages)
+            install_job = start_install_job(
+                app_name, device_id, f"{global_venv_pip} install -U {packages_str}"
+            )
+            next_steps.insert(0, f'Instalando {packages_str} en segundo plano')
+        
+        return json_response({
             'success': True,
             'message': f'App creada para {app_name} (usando entorno global)',
             'app_path': app_path,
             'framework': framework,
             'global_venv': config.GLOBAL_VENV_PATH,
-            'next_steps': [
-                f'Crea tu app en {app_path}/app.py',
-                f'Python: {global_venv_python}',
-                f'Inicia el servidor: cd {app_path} && {global_venv_python} app.py'
-            ]
+            'install_job': install_job,
+            'next_steps': next_steps
         })
         
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': str(e)
         })
 
 @app.route('/api/devtools/list_apps', methods=['GET'])
-def list_web_apps(request):
+async def list_web_apps(request):
     """Listar apps web instaladas"""
     try:
-        # Listar directorios en /home/phablet/Apps
-        result = subprocess.run(
-            ['adb', 'shell', 'ls -la /home/phablet/Apps/ 2>/dev/null || echo "No apps found"'],
-            capture_output=True, text=True, timeout=10
-        )
+        devices = await adb_manager.get_devices()
+        if not devices:
+            return json_response({
+                'success': True,
+                'apps': []
+            })
+        device_id = devices[0]['id']
         
-        if result.returncode != 0 or "No apps found" in result.stdout:
-            return json.dumps({
+        # Apps, their config/PID/tunnel files and the global venv in one adb shell
+        result = await adb_manager.run('-s', device_id, 'shell', LIST_APPS_SCRIPT, timeout=15)
+        
+        if result.returncode != 0:
+            return json_response({
                 'success': True,
                 'apps': []
             })
         
-        # Parsear salida para obtener apps
+        sections = split_sections(result.stdout)
+        # Global venv is shared (no per-app venv)
+        has_venv = sections.get('venv', '').strip() == 'yes'
+        app_files = {}
+        for key, content in sections.items():
+            name, sep, file_name = key.rpartition('/')
+            if sep:
+                app_files.setdefault(name, {})[file_name] = content
+        
+        # `adb forward --list`, fetched once for the first app with a tunnel file
+        forward_list = None
         apps = []
-        lines = result.stdout.strip().split('\n')
-        for line in lines:
-            if line.startswith('d') and '.' not in line.split()[-1]:  # Directorios que no empiezan con .
-                app_name = line.split()[-1]
-                
-                # Global venv is shared (no per-app venv)
-                venv_check = subprocess.run(
-                    ['adb', 'shell', 'test -x /home/phablet/.ubtool/venv/bin/python && echo "yes" || echo "no"'],
-                    capture_output=True, text=True, timeout=5
-                )
-                
-                # Leer configuración si existe
-                config_check = subprocess.run(
-                    ['adb', 'shell', f'test -f /home/phablet/Apps/{app_name}/config.py && cat /home/phablet/Apps/{app_name}/config.py || echo ""'],
-                    capture_output=True, text=True, timeout=5
-                )
-                
-                config = {}
-                if config_check.returncode == 0:
-                    for line in config_check.stdout.strip().split('\n'):
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            config[key.strip()] = value.strip().strip('"\'')
+        for app_name, files in app_files.items():
+            if '.' not in app_name:  # Directorios que no empiezan con .
+                config = parse_key_values(files.get('config'))
+                pid_info = parse_key_values(files.get('PID'))
                 
                 # Verificar si la app está corriendo usando archivos PID
                 is_running = False
                 process_info = {}
                 
                 # Intentar leer del archivo PID detallado primero
-                pid_check = subprocess.run(
-                    ['adb', 'shell', f'test -f /home/phablet/Apps/{app_name}/PID && grep "^PID=" /home/phablet/Apps/{app_name}/PID | cut -d"=" -f2 || echo ""'],
-                    capture_output=True, text=True, timeout=5
-                )
-                
-                if pid_check.stdout.strip():
-                    pid = pid_check.stdout.strip()
+                if pid_info.get('PID'):
+                    pid = pid_info['PID']
                     # Verificar si el proceso existe
-                    process_check = subprocess.run(
-                        ['adb', 'shell', f'ps -p {pid} > /dev/null 2>&1 && echo "running" || echo "stopped"'],
-                        capture_output=True, text=True, timeout=5
+                    process_check = await adb_manager.run(
+                        '-s', device_id, 'shell',
+                        f'ps -p {pid} > /dev/null 2>&1 && echo "running" || echo "stopped"',
+                        timeout=5
                     )
                     is_running = process_check.stdout.strip() == 'running'
                     
                     # Si el proceso no está corriendo, limpiar archivos PID huérfanos
                     if not is_running:
-                        print(f"🧹 Cleaning up orphaned PID files for {app_name}")
+                        logger.info("🧹 Cleaning up orphaned PID files for %s", app_name)
                         cleanup_cmd = f"rm -f /home/phablet/Apps/{app_name}/PID /home/phablet/Apps/{app_name}/app.pid"
-                        subprocess.run(['adb', 'shell', cleanup_cmd], timeout=5)
+                        await adb_manager.run('-s', device_id, 'shell', cleanup_cmd, timeout=5)
                         is_running = False
                     else:
-                        # Obtener información adicional del archivo PID
-                        status_check = subprocess.run(
-                            ['adb', 'shell', f'cat /home/phablet/Apps/{app_name}/PID 2>/dev/null || echo ""'],
-                            capture_output=True, text=True, timeout=5
-                        )
-                        if status_check.returncode == 0:
-                            for line in status_check.stdout.strip().split('\n'):
-                                if '=' in line:
-                                    key, value = line.split('=', 1)
-                                    process_info[key.strip()] = value.strip().strip('"\'')
+                        # Información adicional del archivo PID
+                        process_info.update(pid_info)
                 else:
                     # Si no hay archivo detallado, intentar con el simple
-                    simple_pid_check = subprocess.run(
-                        ['adb', 'shell', f'test -f /home/phablet/Apps/{app_name}/app.pid && cat /home/phablet/Apps/{app_name}/app.pid || echo ""'],
-                        capture_output=True, text=True, timeout=5
-                    )
+                    simple_pid = (files.get('app.pid') or '').strip()
                     
-                    if simple_pid_check.stdout.strip():
-                        pid = simple_pid_check.stdout.strip()
-                        process_check = subprocess.run(
-                            ['adb', 'shell', f'ps -p {pid} > /dev/null 2>&1 && echo "running" || echo "stopped"'],
-                            capture_output=True, text=True, timeout=5
+                    if simple_pid:
+                        pid = simple_pid
+                        process_check = await adb_manager.run(
+                            '-s', device_id, 'shell',
+                            f'ps -p {pid} > /dev/null 2>&1 && echo "running" || echo "stopped"',
+                            timeout=5
                         )
                         is_running = process_check.stdout.strip() == 'running'
                         process_info['PID'] = pid
@@ -2299,88 +2756,78 @@ def list_web_apps(request):
                         if is_running:
                             try:
                                 # Primero intentar obtener el puerto desde el archivo PID que contiene el puerto real
-                                port_from_pid = subprocess.run(
-                                    ['adb', 'shell', f'grep "^PORT=" /home/phablet/Apps/{app_name}/PID 2>/dev/null | cut -d"=" -f2 || echo ""'],
-                                    capture_output=True, text=True, timeout=3
-                                )
+                                port_from_pid = pid_info.get('PORT', '')
                                 
-                                if port_from_pid.returncode == 0 and port_from_pid.stdout.strip():
+                                if port_from_pid:
                                     try:
-                                        dynamic_port = int(port_from_pid.stdout.strip())
+                                        dynamic_port = int(port_from_pid)
                                         config['port'] = str(dynamic_port)
-                                        print(f"DEBUG: Got dynamic port {dynamic_port} from PID file for app {app_name}")
+                                        logger.debug("Got dynamic port %s from PID file for app %s", dynamic_port, app_name)
                                     except ValueError:
-                                        print(f"DEBUG: Could not parse port from PID file for app {app_name}")
+                                        logger.debug("Could not parse port from PID file for app %s", app_name)
                                         config['port'] = config.get('port', '8081')
                                 else:
                                         # Si no hay puerto en PID, intentar desde el API
                                         port_from_config = config.get('port', '8081')
-                                        api_check = subprocess.run(
-                                            ['adb', 'shell', f'curl -s --max-time 2 http://localhost:{port_from_config}/api/status 2>/dev/null | grep -o \'"port": [0-9]*\' | head -1 | cut -d: -f2 | tr -d " " || echo ""'],
-                                            capture_output=True, text=True, timeout=5
+                                        api_check = await adb_manager.run(
+                                            '-s', device_id, 'shell',
+                                            f'curl -s --max-time 2 http://localhost:{port_from_config}/api/status 2>/dev/null | grep -o \'"port": [0-9]*\' | head -1 | cut -d: -f2 | tr -d " " || echo ""',
+                                            timeout=5
                                         )
                                         
                                         if api_check.returncode == 0 and api_check.stdout.strip():
                                             try:
                                                 dynamic_port = int(api_check.stdout.strip())
                                                 config['port'] = str(dynamic_port)
-                                                print(f"DEBUG: Got dynamic port {dynamic_port} from API for app {app_name}")
+                                                logger.debug("Got dynamic port %s from API for app %s", dynamic_port, app_name)
                                             except ValueError:
-                                                print(f"DEBUG: Could not parse port from API for app {app_name}")
+                                                logger.debug("Could not parse port from API for app %s", app_name)
                                                 # Intentar método alternativo con netstat
-                                                port_from_netstat = subprocess.run(
-                                                    ['adb', 'shell', f'netstat -tlnp 2>/dev/null | grep ":.*python.*{app_name}" | head -1 | awk \'{{print $4}}\' | cut -d: -f2 || echo ""'],
-                                                    capture_output=True, text=True, timeout=3
+                                                port_from_netstat = await adb_manager.run(
+                                                    '-s', device_id, 'shell',
+                                                    f'netstat -tlnp 2>/dev/null | grep ":.*python.*{app_name}" | head -1 | awk \'{{print $4}}\' | cut -d: -f2 || echo ""',
+                                                    timeout=3
                                                 )
                                                 if port_from_netstat.returncode == 0 and port_from_netstat.stdout.strip():
                                                     try:
                                                         netstat_port = int(port_from_netstat.stdout.strip())
                                                         config['port'] = str(netstat_port)
-                                                        print(f"DEBUG: Got dynamic port {netstat_port} from netstat for app {app_name}")
+                                                        logger.debug("Got dynamic port %s from netstat for app %s", netstat_port, app_name)
                                                     except ValueError:
                                                         config['port'] = port_from_config
-                                                        print(f"DEBUG: Could not parse port from netstat for app {app_name}")
+                                                        logger.debug("Could not parse port from netstat for app %s", app_name)
                                                 else:
                                                     config['port'] = port_from_config
-                                                    print(f"DEBUG: Could not get port from netstat for app {app_name}, using config {port_from_config}")
+                                                    logger.debug("Could not get port from netstat for app %s, using config %s", app_name, port_from_config)
                                         else:
                                             # Si no se puede obtener del API, usar el del config
                                             config['port'] = port_from_config
-                                            print(f"DEBUG: Could not get port from API for app {app_name}, using config {port_from_config}")
+                                            logger.debug("Could not get port from API for app %s, using config %s", app_name, port_from_config)
                             except Exception as e:
-                                print(f"DEBUG: Error getting dynamic port for {app_name}: {e}")
+                                logger.debug("Error getting dynamic port for %s: %s", app_name, e)
                                 config['port'] = config.get('port', '8081')
                 
                 # Verificar si hay un túnel activo para esta app
                 is_in_develop_mode = False
                 tunnel_info = {}
                 
-                tunnel_check = subprocess.run(
-                    ['adb', 'shell', f'test -f /home/phablet/.ubtool/tunnels/{app_name}.tunnel && cat /home/phablet/.ubtool/tunnels/{app_name}.tunnel || echo ""'],
-                    capture_output=True, text=True, timeout=5
-                )
-                
-                if tunnel_check.returncode == 0 and tunnel_check.stdout.strip():
+                if (files.get('tunnel') or '').strip():
                     # Parsear información del túnel
-                    for line in tunnel_check.stdout.strip().split('\n'):
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            tunnel_info[key.strip()] = value.strip().strip('"\'')
+                    tunnel_info = parse_key_values(files['tunnel'])
                     
                     # Verificar que el túnel esté realmente activo usando adb forward --list
-                    reverse_list = subprocess.run(
-                        ['adb', 'shell', 'adb forward --list 2>/dev/null || echo ""'],
-                        capture_output=True, text=True, timeout=5
-                    )
+                    # (the forwards live in the host's adb server, not on the device)
+                    if forward_list is None:
+                        forward_list = await adb_manager.run('-s', device_id, 'forward', '--list', timeout=5)
                     
-                    if reverse_list.returncode == 0 and tunnel_info.get('LOCAL_PORT'):
+                    if forward_list.returncode == 0 and tunnel_info.get('LOCAL_PORT'):
                         expected_tunnel = f"tcp:{tunnel_info['LOCAL_PORT']} tcp:{tunnel_info.get('DEVICE_PORT', '')}"
-                        if expected_tunnel in reverse_list.stdout:
+                        if expected_tunnel in forward_list.stdout:
                             is_in_develop_mode = True
                 
                 apps.append({
                     'name': app_name,
-                    'has_venv': venv_check.stdout.strip() == 'yes',
+                    'has_venv': has_venv,
                     'config': config,
                     'path': f'/home/phablet/Apps/{app_name}',
                     'global_venv': '/home/phablet/.ubtool/venv',
@@ -2390,13 +2837,13 @@ def list_web_apps(request):
                     'tunnel_info': tunnel_info
                 })
         
-        return json.dumps({
+        return json_response({
             'success': True,
             'apps': apps
         })
         
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -2409,17 +2856,20 @@ def start_web_app(request):
         app_name = data.get('app_name', '').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
         # Verificar si la app existe
         check_cmd = f"test -d /home/phablet/Apps/{app_name}"
         check_result = subprocess.run(['adb', 'shell', check_cmd], timeout=5)
         
         if check_result.returncode != 0:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': f'App {app_name} no encontrada'
             })
@@ -2468,13 +2918,13 @@ def start_web_app(request):
         
         # Si se encontró PID pero el proceso no está corriendo, limpiar archivos huérfanos
         if (pid_check.stdout.strip() or simple_pid_check.stdout.strip()) and not is_running:
-            print(f"🧹 Cleaning up orphaned PID files for {app_name} (stop check)")
+            logger.info("🧹 Cleaning up orphaned PID files for %s (stop check)", app_name)
             cleanup_cmd = f"rm -f /home/phablet/Apps/{app_name}/PID /home/phablet/Apps/{app_name}/app.pid"
             subprocess.run(['adb', 'shell', cleanup_cmd], timeout=5)
             is_running = False
         
         if is_running:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': f'App {app_name} ya está corriendo'
             })
@@ -2484,11 +2934,11 @@ def start_web_app(request):
         
         # Obtener el puerto dinámico ANTES de iniciar la app
         port = get_next_available_port()
-        print(f"DEBUG: Using dynamic port {port} for app {app_name}")
+        logger.debug("Using dynamic port %s for app %s", port, app_name)
         
         # Iniciar app en segundo plano con el puerto dinámico como argumento
         start_cmd = f"cd /home/phablet/Apps/{app_name} && nohup {python_executable} app.py {port} > app.log 2>&1 &"
-        print(f"DEBUG: Running start_cmd: {start_cmd}")
+        logger.debug("Running start_cmd: %s", start_cmd)
         
         # Ejecutar en background sin esperar respuesta
         try:
@@ -2499,10 +2949,9 @@ def start_web_app(request):
                                        text=True)
             
             # No esperar - el proceso corre en background
-            print(f"DEBUG: Process started in background")
+            logger.debug("Process started in background")
             
             # Esperar un momento y buscar el proceso
-            import time
             time.sleep(3)
             
             # Buscar el PID del proceso iniciado
@@ -2511,7 +2960,7 @@ def start_web_app(request):
             
             if find_result.returncode == 0 and find_result.stdout.strip():
                 process_id = find_result.stdout.strip()
-                print(f"DEBUG: Found Process ID = {process_id}")
+                logger.debug("Found Process ID = %s", process_id)
                 
                 # Crear archivos PID usando el puerto ya calculado
                 # También guardar en config.py para referencia futura
@@ -2526,8 +2975,7 @@ DEBUG = True
                 subprocess.run(['adb', 'shell', config_cmd], timeout=3)
                 
                 # Crear archivo PID
-                from datetime import datetime
-                current_time = datetime.now().strftime('%Y-%m-%d_%H:%M:%S')
+                current_time = time.strftime('%Y-%m-%d_%H:%M:%S')
                 pid_info = f"""# App Process Information
 PID={process_id}
 APP_NAME={app_name}
@@ -2543,9 +2991,9 @@ STATUS=started
                 simple_pid_cmd = f"echo {process_id} > /home/phablet/Apps/{app_name}/app.pid"
                 subprocess.run(['adb', 'shell', simple_pid_cmd], timeout=3)
                 
-                print(f"DEBUG: PID file created for {app_name} with process {process_id}")
+                logger.debug("PID file created for %s with process %s", app_name, process_id)
                 
-                return json.dumps({
+                return json_response({
                     'success': True,
                     'message': f'App {app_name} iniciada (PID: {process_id})',
                     'access_url': f'http://localhost:{port}',
@@ -2555,7 +3003,7 @@ STATUS=started
                 })
             else:
                 # No encontramos el PID pero el comando se ejecutó
-                return json.dumps({
+                return json_response({
                     'success': True,
                     'message': f'App {app_name} iniciada (proceso en background)',
                     'access_url': f'http://localhost:8081',
@@ -2564,9 +3012,9 @@ STATUS=started
                 })
                 
         except Exception as e:
-            print(f"DEBUG: Exception in start_app: {str(e)}")
+            logger.warning("Exception in start_app: %s", e)
             # Si hay excepción, pero el proceso pudo iniciar, devolver éxito
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'message': f'App {app_name} iniciada (proceso en background)',
                 'access_url': f'http://localhost:8081',
@@ -2575,8 +3023,8 @@ STATUS=started
             })
             
     except Exception as e:
-        print(f"DEBUG: Exception in start_app: {str(e)}")
-        return json.dumps({
+        logger.error("Exception in start_app: %s", e)
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -2589,11 +3037,14 @@ def stop_web_app(request):
         app_name = data.get('app_name', '').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
         # Leer PID del archivo si existe (primero intentar el archivo detallado)
         pid_file_detailed = f"/home/phablet/Apps/{app_name}/PID"
         pid_file_simple = f"/home/phablet/Apps/{app_name}/app.pid"
@@ -2609,7 +3060,7 @@ def stop_web_app(request):
         
         if pid_result.stdout.strip():
             process_id = pid_result.stdout.strip()
-            print(f"DEBUG: Stopping process {process_id}")
+            logger.debug("Stopping process %s", process_id)
             
             # Verificar si el proceso todavía existe
             verify_cmd = f"ps -p {process_id} > /dev/null 2>&1 && echo 'running' || echo 'stopped'"
@@ -2621,7 +3072,6 @@ def stop_web_app(request):
                 result = subprocess.run(['adb', 'shell', stop_cmd], timeout=10)
                 
                 # Esperar un momento y verificar que se detuvo
-                import time
                 time.sleep(1)
                 
                 verify_after_cmd = f"ps -p {process_id} > /dev/null 2>&1 && echo 'running' || echo 'stopped'"
@@ -2636,24 +3086,24 @@ def stop_web_app(request):
             clean_pid_cmd = f"rm -f {pid_file_detailed} {pid_file_simple}"
             subprocess.run(['adb', 'shell', clean_pid_cmd], timeout=5)
             
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'message': f'App {app_name} detenida (PID: {process_id})'
             })
         else:
             # Si no hay PID, usar método general
-            print(f"DEBUG: No PID found, using general stop method")
+            logger.debug("No PID found, using general stop method")
             stop_cmd = f"pkill -f '/home/phablet/Apps/{app_name}.*app.py' || pkill -f 'app.py.*{app_name}'"
             result = subprocess.run(['adb', 'shell', stop_cmd], timeout=10)
             
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'message': f'App {app_name} detenida'
             })
         
     except Exception as e:
-        print(f"DEBUG: Exception in stop_app: {str(e)}")
-        return json.dumps({
+        logger.error("Exception in stop_app: %s", e)
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -2666,11 +3116,14 @@ def delete_web_app(request):
         app_name = data.get('app_name', '').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
         # Detener app primero
         stop_cmd = f"pkill -f '/home/phablet/Apps/{app_name}.*app.py' || pkill -f 'app.py.*{app_name}'"
         subprocess.run(['adb', 'shell', stop_cmd], timeout=10)
@@ -2680,18 +3133,18 @@ def delete_web_app(request):
         result = subprocess.run(['adb', 'shell', delete_cmd], timeout=10)
         
         if result.returncode == 0:
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'message': f'App {app_name} eliminada correctamente'
             })
         else:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': f'Error al eliminar app {app_name}'
             })
         
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -2704,11 +3157,14 @@ def prepare_app_for_deployment(request):
         app_name = data.get('app_name', '').strip()
         
         if not app_name:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': 'Nombre de app requerido'
             })
         
+        if not is_valid_app_name(app_name):
+            return json_response({'success': False, 'error': INVALID_APP_NAME_ERROR})
+        
         adb_bin = adb_manager.adb_path or 'adb'
         app_path = f"/home/phablet/Apps/{app_name}"
         deploy_path = f"/home/phablet/Apps/{app_name}_deploy"
@@ -2717,7 +3173,7 @@ def prepare_app_for_deployment(request):
         check_cmd = f"test -d {app_path}"
         check_result = subprocess.run([adb_bin, 'shell', check_cmd], timeout=5)
         if check_result.returncode != 0:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': f'La app {app_name} no existe'
             })
@@ -2819,7 +3275,6 @@ def build(output):
     output_dir.mkdir(exist_ok=True)
     
     # Copy application files
-    import shutil
     shutil.copytree('templates', output_dir / 'templates', dirs_exist_ok=True)
     shutil.copytree('static', output_dir / 'static', dirs_exist_ok=True)
     shutil.copy('app.py', output_dir)
@@ -3019,15 +3474,13 @@ MIT License
                 capture_output=True, text=True, timeout=60
             )
             if result.returncode != 0:
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': f'Error en comando: {cmd}',
                     'details': result.stderr
                 })
         
         # Escribir archivos usando base64 para evitar problemas con caracteres especiales
-        import base64
-        
         files_to_create = [
             ('requirements.txt', requirements_content),
             ('app.py', app_py_content),
@@ -3042,7 +3495,7 @@ MIT License
             write_cmd = f"echo '{content_b64}' | base64 -d > {deploy_path}/{filename}"
             result = subprocess.run([adb_bin, 'shell', write_cmd], timeout=30)
             if result.returncode != 0:
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': f'Error al crear {filename}',
                     'details': result.stderr
@@ -3052,7 +3505,7 @@ MIT License
         chmod_cmd = f"chmod +x {deploy_path}/app.py"
         subprocess.run([adb_bin, 'shell', chmod_cmd], timeout=10)
         
-        return json.dumps({
+        return json_response({
             'success': True,
             'message': f'App {app_name} preparada para deployment',
             'deploy_path': deploy_path,
@@ -3075,7 +3528,7 @@ MIT License
         })
         
     except Exception as e:
-        return json.dumps({
+        return json_response({
             'success': False,
             'error': str(e)
         })
@@ -3154,36 +3607,29 @@ uvicorn.run(app, host=host, port=PORT, debug=debug)
 async def device_status(request):
     """API: Estado del dispositivo"""
     if not adb_manager.is_available():
-        return {
-            'connected': False,
-            'error': 'ADB no disponible',
-            'devices': []
-        }
+        return Response(_ADB_UNAVAILABLE_STATUS_BODY, headers=JSON_HEADERS)
     
-    devices = adb_manager.get_devices()
+    devices = await adb_manager.get_devices()
     
     if devices:
-        return {
+        return json_response({
             'connected': True,
             'devices': devices,
             'device': devices[0]['id'] if devices else None
-        }
+        })
     else:
-        return {
-            'connected': False,
-            'devices': []
-        }
+        return Response(_NO_DEVICES_STATUS_BODY, headers=JSON_HEADERS)
 
 @app.route('/api/device/info')
 async def device_info(request):
     """API: Información del dispositivo"""
-    info = adb_manager.get_device_info()
+    info = await adb_manager.get_device_info()
     
     if info:
-        return {
+        return json_response({
             'success': True,
             'info': info
-        }
+        })
     else:
         return {
             'success': False,
@@ -3197,7 +3643,6 @@ async def check_version(request):
     current_version = "v1.4.0"
     
     try:
-        import re
         import requests
         
         # Get current version from file
@@ -3246,14 +3691,14 @@ async def shell_command(request):
             'error': 'Comando no especificado'
         }
     
-    result = adb_manager.execute_shell_command(data['command'])
+    result = await adb_manager.execute_shell_command(data['command'])
     
-    return {
+    return json_response({
         'success': 'error' not in result,
         'output': result.get('output', ''),
         'error': result.get('error'),
         'return_code': result.get('return_code', 0)
-    }
+    })
 
 @app.route('/api/device/open_url', methods=['POST'])
 async def open_url_on_device(request):
@@ -3262,7 +3707,7 @@ async def open_url_on_device(request):
         if not adb_manager.is_available():
             return {'success': False, 'error': 'ADB no disponible'}
 
-        devices = adb_manager.get_devices()
+        devices = await adb_manager.get_devices()
         if not devices:
             return {'success': False, 'error': 'No hay dispositivos conectados'}
 
@@ -3276,23 +3721,20 @@ async def open_url_on_device(request):
         if not (url.startswith('http://') or url.startswith('https://')):
             return {'success': False, 'error': 'url inválida (debe empezar con http:// o https://)'}
 
-        adb_bin = adb_manager.adb_path or 'adb'
-        safe_url = url.replace("'", "'\\''")
+        safe_url = shlex.quote(url)
 
         # Ubuntu Touch typically has url-dispatcher
         candidates = [
-            f"url-dispatcher '{safe_url}'",
-            f"xdg-open '{safe_url}'",
-            f"/usr/bin/url-dispatcher '{safe_url}'",
+            f"url-dispatcher {safe_url}",
+            f"xdg-open {safe_url}",
+            f"/usr/bin/url-dispatcher {safe_url}",
         ]
 
         last = None
         for cmd in candidates:
             try:
-                last = subprocess.run(
-                    [adb_bin, '-s', device_id, 'shell', 'sh', '-c', cmd],
-                    capture_output=True,
-                    text=True,
+                last = await adb_manager.run(
+                    '-s', device_id, 'shell', cmd,
                     timeout=10
                 )
                 if last.returncode == 0:
@@ -3320,17 +3762,12 @@ async def open_url_on_device(request):
 @app.route('/api/device/reboot', methods=['POST'])
 async def reboot_device(request):
     """API: Reiniciar dispositivo"""
-    result = adb_manager.reboot_device()
+    result = await adb_manager.reboot_device()
     return result
 
 @app.route('/api/simple-develop/start', methods=['POST'])
 async def start_develop_mode(request):
     """API: Iniciar modo desarrollo con túnel para app web"""
-    import subprocess
-    import os
-    import time
-    import platform
-    
     try:
         data = request.json or {}
         app_name = data.get('app_name', '').strip()
@@ -3341,6 +3778,9 @@ async def start_develop_mode(request):
                 'error': 'Nombre de app requerido'
             }
         
+        if not is_valid_app_name(app_name):
+            return {'success': False, 'error': INVALID_APP_NAME_ERROR}
+        
         # Verificar que el dispositivo está conectado
         if not adb_manager.is_available():
             return {
@@ -3350,7 +3790,7 @@ async def start_develop_mode(request):
         
         # Verificar que la app está corriendo
         check_cmd = f"test -f /home/phablet/Apps/{app_name}/PID"
-        check_result = subprocess.run(['adb', 'shell', check_cmd], timeout=5, capture_output=True)
+        check_result = await adb_manager.run('shell', check_cmd, timeout=5)
         
         if check_result.returncode != 0:
             return {
@@ -3360,7 +3800,7 @@ async def start_develop_mode(request):
         
         # Obtener el puerto de la app desde el archivo PID
         port_cmd = f"grep '^PORT=' /home/phablet/Apps/{app_name}/PID | cut -d'=' -f2"
-        port_result = subprocess.run(['adb', 'shell', port_cmd], timeout=5, capture_output=True, text=True)
+        port_result = await adb_manager.run('shell', port_cmd, timeout=5)
         
         if port_result.returncode != 0 or not port_result.stdout.strip():
             return {
@@ -3388,7 +3828,6 @@ async def start_develop_mode(request):
         for attempt in range(max_attempts):
             try:
                 # Verificar si el puerto local está disponible
-                import socket
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 result = sock.connect_ex(('localhost', local_port))
                 sock.close()
@@ -3405,24 +3844,22 @@ async def start_develop_mode(request):
             }
         
         # Limpiar túneles existentes para esta app
-        cleanup_cmd = f"adb forward --remove tcp:{local_port}"
-        subprocess.run(cleanup_cmd.split(), timeout=5, capture_output=True)
+        await adb_manager.run('forward', '--remove', f'tcp:{local_port}', timeout=5)
         
         # Crear el túnel usando ADB forward (más compatible que reverse)
-        tunnel_cmd = f"adb forward tcp:{local_port} tcp:{device_port}"
-        tunnel_result = subprocess.run(tunnel_cmd.split(), timeout=10, capture_output=True)
+        tunnel_result = await adb_manager.run('forward', f'tcp:{local_port}', f'tcp:{device_port}', timeout=10)
         
         if tunnel_result.returncode != 0:
             return {
                 'success': False,
-                'error': f'Error al crear túnel: {tunnel_result.stderr.decode()}'
+                'error': f'Error al crear túnel: {tunnel_result.stderr}'
             }
         
         # Verificar que el túnel funciona usando netcat
         try:
             # Usar netcat para verificar conexión local
             test_cmd = f"echo -e 'GET / HTTP/1.1\\r\\nHost: localhost\\r\\n\\r\\n' | nc localhost {local_port} | head -n 1"
-            test_result = subprocess.run(test_cmd, shell=True, timeout=5, capture_output=True, text=True)
+            test_result = await run_blocking(subprocess.run, test_cmd, shell=True, timeout=5, capture_output=True, text=True)
             
             # Considerar éxito si hay alguna respuesta o conexión establecida
             tunnel_working = test_result.returncode == 0 or 'HTTP' in test_result.stdout or test_result.stdout.strip()
@@ -3430,16 +3867,16 @@ async def start_develop_mode(request):
             if not tunnel_working:
                 # Intentar verificación básica de conexión
                 connect_cmd = f"nc -z localhost {local_port}"
-                connect_result = subprocess.run(connect_cmd, shell=True, timeout=3)
+                connect_result = await run_blocking(subprocess.run, connect_cmd, shell=True, timeout=3)
                 tunnel_working = connect_result.returncode == 0
                 
         except Exception as e:
-            print(f"DEBUG: Error verificando túnel: {e}")
+            logger.debug("Error verificando túnel: %s", e)
             tunnel_working = False
         
         if not tunnel_working:
             # Limpiar túnel si no funciona
-            subprocess.run(f"adb forward --remove tcp:{local_port}".split(), timeout=5)
+            await adb_manager.run('forward', '--remove', f'tcp:{local_port}', timeout=5)
             return {
                 'success': False,
                 'error': 'El túnel se creó pero no hay respuesta del servidor. Verifica que la app esté funcionando correctamente.'
@@ -3450,16 +3887,10 @@ async def start_develop_mode(request):
             'app_name': app_name,
             'device_port': device_port,
             'local_port': local_port,
-            'start_time': subprocess.run(['date', '+%Y-%m-%d_%H:%M:%S'], capture_output=True, text=True).stdout.strip()
+            'start_time': time.strftime('%Y-%m-%d_%H:%M:%S')
         }
         
         # Crear workspace local sincronizado compatible con Windows/Linux/Mac
-        import tempfile
-        import shutil
-        import time
-        import platform
-        import os
-        
         # Determinar directorio base en el home del usuario según el sistema operativo
         if platform.system() == 'Windows':
             # En Windows usar %USERPROFILE%
@@ -3487,49 +3918,49 @@ async def start_develop_mode(request):
             # Ordenar por fecha de modificación y usar el más reciente
             existing_workspaces.sort(key=lambda x: os.path.getmtime(x), reverse=True)
             workspace_path = existing_workspaces[0]
-            print(f"🔄 Reusing existing workspace: {workspace_path}")
+            logger.info("🔄 Reusing existing workspace: %s", workspace_path)
         else:
             # Crear nuevo workspace con timestamp
             workspace_path = os.path.join(ubtool_dir, f'ubtool_workspace_{app_name}_{int(time.time())}')
-            print(f"🆕 Creating new workspace: {workspace_path}")
+            logger.info("🆕 Creating new workspace: %s", workspace_path)
         
         try:
             # Crear directorio de trabajo local
             os.makedirs(workspace_path, exist_ok=True)
-            print(f"✅ Workspace directory ready: {workspace_path}")
+            logger.debug("Workspace directory ready: %s", workspace_path)
             
             # Determinar si es un workspace nuevo o existente
             is_new_workspace = not any(existing_workspaces)
             
             if is_new_workspace:
                 # Solo copiar archivos si es un workspace nuevo
-                copy_cmd = f"adb pull /home/phablet/Apps/{app_name}/ {workspace_path}/"
-                print(f"🔄 Copying app files: {copy_cmd}")
-                copy_result = subprocess.run(copy_cmd.split(), timeout=30, capture_output=True, text=True)
+                logger.info("🔄 Copying app files of %s to %s", app_name, workspace_path)
+                copy_result = await adb_manager.run(
+                    'pull', f'/home/phablet/Apps/{app_name}/', f'{workspace_path}/', timeout=30
+                )
                 
-                print(f"📋 ADB pull result: {copy_result.returncode}")
+                logger.debug("adb pull result: %s", copy_result.returncode)
                 if copy_result.stdout:
-                    print(f"📤 STDOUT: {copy_result.stdout.strip()}")
+                    logger.debug("adb pull stdout: %s", copy_result.stdout.strip())
                 if copy_result.stderr:
-                    print(f"⚠️ STDERR: {copy_result.stderr.strip()}")
+                    logger.debug("adb pull stderr: %s", copy_result.stderr.strip())
                 
                 # Verificar si al menos algunos archivos se copiaron exitosamente
                 if copy_result.returncode != 0:
                     # Verificar si el directorio de workspace tiene contenido
                     if os.path.exists(workspace_path) and os.listdir(workspace_path):
-                        print(f"⚠️ WARNING: Some files could not be copied, but workspace was created with partial content")
-                        print(f"📁 Workspace contents: {os.listdir(workspace_path)}")
+                        logger.warning("⚠️ Some files could not be copied, workspace %s has partial content: %s",
+                                       workspace_path, os.listdir(workspace_path))
                     else:
-                        print(f"❌ ERROR: Could not copy app files from device")
-                        print(f"   Command: {copy_cmd}")
-                        print(f"   Error: {copy_result.stderr}")
+                        logger.error("❌ Could not copy app files of %s from device: %s",
+                                     app_name, copy_result.stderr.strip())
                         # No continuar si no se pueden copiar ningún archivo
                         return tunnel_info
                 else:
-                    print(f"✅ App files copied to {workspace_path}")
+                    logger.info("✅ App files copied to %s", workspace_path)
             else:
-                print(f"📂 Using existing workspace, skipping file copy")
-                print(f"📁 Current workspace contents: {os.listdir(workspace_path)}")
+                logger.info("📂 Using existing workspace, skipping file copy")
+                logger.debug("Current workspace contents: %s", os.listdir(workspace_path))
             
             # Continuar si tenemos al menos un directorio o archivo en el workspace
             if os.path.exists(workspace_path):
@@ -3537,13 +3968,13 @@ async def start_develop_mode(request):
                 try:
                     workspace_items = os.listdir(workspace_path)
                 except PermissionError:
-                    print(f"⚠️ WARNING: Cannot access workspace directory")
+                    logger.warning("⚠️ Cannot access workspace directory %s", workspace_path)
                     return tunnel_info
                 
                 if workspace_items:
-                    print(f"✅ Workspace contains content, proceeding with setup...")
+                    logger.debug("Workspace contains content, proceeding with setup")
                 else:
-                    print(f"⚠️ WARNING: Workspace is empty, but proceeding anyway...")
+                    logger.warning("⚠️ Workspace %s is empty, proceeding anyway", workspace_path)
                     
                 # Guardar información del workspace
                 workspace_info = {
@@ -3557,11 +3988,10 @@ async def start_develop_mode(request):
                 config_file = f"{workspace_path}/.ubtool_workspace"
                 try:
                     with open(config_file, 'w') as f:
-                        import json
                         json.dump(workspace_info, f, indent=2)
-                    print(f"✅ Workspace config created: {config_file}")
+                    logger.debug("Workspace config created: %s", config_file)
                 except Exception as config_e:
-                    print(f"❌ ERROR creating config file: {config_e}")
+                    logger.error("❌ Error creating workspace config %s: %s", config_file, config_e)
                 
                 # Agregar comando de sincronización automática compatible con Windows/Linux/Mac
                 if platform.system() == 'Windows':
@@ -3677,12 +4107,12 @@ done
                 try:
                     with open(script_path, 'w') as f:
                         f.write(sync_script)
-                    print(f"✅ Sync script created: {script_path}")
+                    logger.debug("Sync script created: %s", script_path)
                     
                     # Asignar permisos ejecutables (solo en Linux/Mac)
                     if platform.system() != 'Windows':
                         os.chmod(script_path, 0o755)
-                        print(f"✅ Made sync script executable")
+                        logger.debug("Made sync script executable")
                         
                         # Iniciar script de sincronización en segundo plano
                         try:
@@ -3693,43 +4123,39 @@ done
                                 stderr=subprocess.DEVNULL,
                                 start_new_session=True
                             )
-                            print(f"🔄 Auto-sync started in background (PID: {sync_process.pid})")
-                            print(f"📝 Sync log: {workspace_path}/nohup.out")
+                            logger.info("🔄 Auto-sync started in background (PID: %s, log: %s/nohup.out)",
+                                        sync_process.pid, workspace_path)
                             
                             # Guardar PID del proceso de sincronización
                             workspace_info['sync_pid'] = sync_process.pid
                             
                         except Exception as sync_e:
-                            print(f"⚠️ WARNING: Could not start auto-sync: {sync_e}")
-                            print(f"💡 You can start it manually with: {script_path}")
+                            logger.warning("⚠️ Could not start auto-sync: %s (start it manually with %s)",
+                                           sync_e, script_path)
                     
                 except Exception as script_e:
-                    print(f"❌ ERROR creating sync script: {script_e}")
+                    logger.error("❌ Error creating sync script %s: %s", script_path, script_e)
                 
                 tunnel_info['workspace'] = workspace_info
                 tunnel_info['sync_script'] = script_path
             else:
-                print(f"❌ ERROR: Workspace directory does not exist")
+                logger.error("❌ Workspace directory %s does not exist", workspace_path)
                 return tunnel_info
                 
         except Exception as e:
-            print(f"❌ CRITICAL ERROR creating workspace: {e}")
-            print(f"   Workspace path: {workspace_path}")
-            print(f"   Error type: {type(e).__name__}")
-            import traceback
-            print(f"   Traceback: {traceback.format_exc()}")
+            logger.exception("❌ Error creating workspace %s: %s", workspace_path, e)
         
         # Crear directorio para túneles si no existe
-        subprocess.run(['adb', 'shell', 'mkdir -p /home/phablet/.ubtool/tunnels'], timeout=5)
+        await adb_manager.run('shell', 'mkdir -p /home/phablet/.ubtool/tunnels', timeout=5)
         
         # Guardar información del túnel en el dispositivo
         tunnel_data = f"APP_NAME={app_name}\nDEVICE_PORT={device_port}\nLOCAL_PORT={local_port}\nSTART_TIME={tunnel_info['start_time']}\nSTATUS=active"
         echo_cmd = f"echo '{tunnel_data}' > /home/phablet/.ubtool/tunnels/{app_name}.tunnel"
-        subprocess.run(['adb', 'shell', echo_cmd], timeout=5)
+        await adb_manager.run('shell', echo_cmd, timeout=5)
         
         # También guardar en un registro global de túneles activos
         tunnel_registry_cmd = f"echo '{app_name}:{local_port}:{device_port}' >> /home/phablet/.ubtool/tunnels/active_tunnels.txt"
-        subprocess.run(['adb', 'shell', tunnel_registry_cmd], timeout=5)
+        await adb_manager.run('shell', tunnel_registry_cmd, timeout=5)
         
         return {
             'success': True,
@@ -3760,8 +4186,7 @@ async def get_develop_status(request):
     """API: Obtener estado del modo desarrollo"""
     try:
         # Listar túneles activos
-        list_cmd = "adb forward --list"
-        result = subprocess.run(list_cmd.split(), timeout=5, capture_output=True, text=True)
+        result = await adb_manager.run('forward', '--list', timeout=5)
         
         if result.returncode == 0:
             tunnels = []
@@ -3806,7 +4231,7 @@ async def get_tunnel_registry(request):
     try:
         # Leer el registro global de túneles activos
         registry_cmd = "cat /home/phablet/.ubtool/tunnels/active_tunnels.txt 2>/dev/null || echo ''"
-        result = subprocess.run(['adb', 'shell', registry_cmd], timeout=5, capture_output=True, text=True)
+        result = await adb_manager.run('shell', registry_cmd, timeout=5)
         
         if result.returncode == 0 and result.stdout.strip():
             tunnels = []
@@ -3846,9 +4271,12 @@ async def get_tunnel_registry(request):
 async def stop_develop_mode(request, app_name):
     """API: Detener modo desarrollo para una app específica"""
     try:
+        if not is_valid_app_name(app_name):
+            return {'success': False, 'error': INVALID_APP_NAME_ERROR}
+        
         # Obtener información del túnel
         tunnel_info_cmd = f"test -f /home/phablet/.ubtool/tunnels/{app_name}.tunnel && cat /home/phablet/.ubtool/tunnels/{app_name}.tunnel"
-        result = subprocess.run(['adb', 'shell', tunnel_info_cmd], timeout=5, capture_output=True, text=True)
+        result = await adb_manager.run('shell', tunnel_info_cmd, timeout=5)
         
         if result.returncode != 0:
             return {
@@ -3870,39 +4298,38 @@ async def stop_develop_mode(request, app_name):
             }
         
         # Remover el túnel
-        remove_cmd = f"adb forward --remove tcp:{local_port}"
-        subprocess.run(remove_cmd.split(), timeout=5, capture_output=True)
+        await adb_manager.run('forward', '--remove', f'tcp:{local_port}', timeout=5)
         
         # Eliminar archivo de túnel
         delete_cmd = f"rm -f /home/phablet/.ubtool/tunnels/{app_name}.tunnel"
-        subprocess.run(['adb', 'shell', delete_cmd], timeout=5)
+        await adb_manager.run('shell', delete_cmd, timeout=5)
         
         # Eliminar del registro global de túneles activos
         remove_from_registry_cmd = f"sed -i '/^{app_name}:/d' /home/phablet/.ubtool/tunnels/active_tunnels.txt 2>/dev/null || true"
-        subprocess.run(['adb', 'shell', remove_from_registry_cmd], timeout=5)
+        await adb_manager.run('shell', remove_from_registry_cmd, timeout=5)
         
         # Detener proceso de sincronización si está corriendo
         try:
             # Buscar PIDs de procesos de sincronización para esta app
             find_sync_pids_cmd = f"ps aux | grep 'sync.sh.*{app_name}' | grep -v grep | awk '{{print $2}}'"
-            result = subprocess.run(['bash', '-c', find_sync_pids_cmd], timeout=5, capture_output=True, text=True)
+            result = await run_blocking(subprocess.run, ['bash', '-c', find_sync_pids_cmd], timeout=5, capture_output=True, text=True)
             
             if result.stdout.strip():
                 pids = result.stdout.strip().split('\n')
                 for pid in pids:
                     if pid.strip():
                         try:
-                            subprocess.run(['kill', '-TERM', pid.strip()], timeout=5)
-                            print(f"🛑 Stopped sync process (PID: {pid.strip()})")
+                            await run_blocking(subprocess.run, ['kill', '-TERM', pid.strip()], timeout=5)
+                            logger.info("🛑 Stopped sync process (PID: %s)", pid.strip())
                         except:
                             try:
-                                subprocess.run(['kill', '-KILL', pid.strip()], timeout=5)
-                                print(f"💀 Force killed sync process (PID: {pid.strip()})")
+                                await run_blocking(subprocess.run, ['kill', '-KILL', pid.strip()], timeout=5)
+                                logger.info("💀 Force killed sync process (PID: %s)", pid.strip())
                             except:
                                 pass
-                print(f"✅ Auto-sync stopped for {app_name}")
+                logger.info("✅ Auto-sync stopped for %s", app_name)
         except Exception as sync_stop_e:
-            print(f"⚠️ Could not stop sync process: {sync_stop_e}")
+            logger.warning("⚠️ Could not stop sync process: %s", sync_stop_e)
         
         return {
             'success': True,
@@ -3930,7 +4357,7 @@ async def create_terminal(request):
     data = request.json or {}
     device_id = data.get('device_id')
     
-    session_id = terminal_manager.create_session(device_id)
+    session_id = await terminal_manager.create_session(device_id)
     
     if session_id:
         return {
@@ -3977,78 +4404,131 @@ async def get_terminal_output(request, session_id):
     session = terminal_manager.get_session(session_id)
     
     if session:
-        output = session.get_buffer()
-        session.clear_buffer()
+        # Most polls find nothing new: answer those with a bodyless 304.
+        # Read the tag before draining so output racing in is never skipped.
+        etag = f'W/"{session.generation}-{int(session.active)}"'
+        # no-store: the browser must not replay a drained body on its own
+        headers = {'ETag': etag, 'Cache-Control': 'no-store'}
+        if request.headers.get('If-None-Match') == etag:
+            return Response('', status_code=304, headers=headers)
         
-        return {
+        output = session.drain_buffer()
+        
+        response = json_response({
             'success': True,
             'output': output,
             'active': session.active
-        }
+        })
+        response.headers.update(headers)
+        return response
     else:
-        return {
-            'success': False,
-            'error': 'Sesión no encontrada'
-        }
+        return Response(_TERMINAL_NOT_FOUND_BODY, headers=JSON_HEADERS)
 
-@app.route('/api/terminal/<session_id>/close', methods=['POST'])
+@app.route('/api/terminal/<session_id>/ws')
+@with_websocket
+async def terminal_websocket(request, ws, session_id):
+    """API: Stream de salida del terminal por WebSocket"""
+    session = terminal_manager.get_session(session_id)
+    if not session:
+        return
+    
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    callback_id = uuid.uuid4().hex
+    # The PTY monitor runs in a thread: hand chunks over to the event loop
+    session.add_callback(
+        callback_id,
+        lambda _session_id, chunk: loop.call_soon_threadsafe(queue.put_nowait, chunk)
+    )
+    receiver = getter = None
+    
+    try:
+        # Flush whatever was buffered before the socket connected
+        pending = session.drain_buffer()
+        if pending:
+            await ws.send(pending)
+        
+        # Messages from the client are terminal input; a close frame ends the stream
+        receiver = asyncio.ensure_future(ws.receive())
+        while session.active:
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver}, timeout=1, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                session.write_input(receiver.result())
+                receiver = asyncio.ensure_future(ws.receive())
+            if getter in done:
+                await ws.send(getter.result())
+                getter = None
+        
+        while not queue.empty():
+            await ws.send(queue.get_nowait())
+    finally:
+        session.remove_callback(callback_id)
+        for task in (receiver, getter):
+            if task is not None:
+                task.cancel()
+
+@app.post('/api/terminal/<session_id>/close')
 async def close_terminal(request, session_id):
     """API: Close terminal session"""
-    terminal_manager.close_session(session_id)
+    await terminal_manager.close_session_async(session_id)
     
-    return {
-        'success': True
-    }
+    return Response(_SUCCESS_BODY, headers=JSON_HEADERS)
 
-@app.route('/api/terminal/sessions')
-async def list_terminal_sessions(request):
-    """API: List active terminal sessions"""
-    sessions = terminal_manager.get_active_sessions()
+def prioritize_routes(*handlers):
+    """Pone las rutas indicadas al principio de la tabla de Microdot.
     
-    return {
-        'success': True,
-        'sessions': sessions
-    }
+    Microdot prueba las rutas en orden de registro; las de sondeo frecuente
+    se resuelven así sin evaluar antes el patrón de todas las demás.
+    """
+    hot = [route for route in app.url_map if route[2] in handlers]
+    app.url_map[:] = hot + [route for route in app.url_map if route[2] not in handlers]
 
 @app.errorhandler(404)
 async def not_found(request):
     """Manejador de 404"""
-    return {'error': 'Not found'}, 404
+    return Response(_NOT_FOUND_BODY, status_code=404, headers=JSON_HEADERS)
 
 @app.errorhandler(500)
 async def server_error(request):
     """Manejador de 500"""
-    return {'error': 'Internal server error'}, 500
+    return Response(_SERVER_ERROR_BODY, status_code=500, headers=JSON_HEADERS)
 
 def main():
     """Función principal"""
-    print("🚀 Iniciando UBTool - Ubuntu Touch Connection Tool")
-    print(f"🌐 Servidor disponible en: http://{HOST}:{PORT}")
+    # Faster drop-in event loop when available (not on Windows)
+    if uvloop is not None and USE_UVLOOP:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Usando uvloop como event loop")
+    
+    logger.info("🚀 Iniciando UBTool - Ubuntu Touch Connection Tool")
+    logger.info("🌐 Servidor disponible en: %s", SERVER_URL)
     
     # Verificar ADB
     if not adb_manager.is_available():
-        print("⚠️  ADB no está disponible. Algunas funciones no funcionarán.")
-        print("   Por favor instala Android SDK Platform Tools")
+        logger.warning("⚠️  ADB no está disponible. Algunas funciones no funcionarán. "
+                       "Por favor instala Android SDK Platform Tools")
     else:
-        print(f"✅ ADB encontrado en: {adb_manager.adb_path}")
+        logger.info("✅ ADB encontrado en: %s", adb_manager.adb_path)
+    
+    # First page hits are served straight from memory (DEBUG re-renders anyway)
+    if not DEBUG:
+        warm_page_cache()
+    
+    # Polled by the UI every few hundred ms / seconds
+    prioritize_routes(
+        get_terminal_output, list_terminal_sessions, device_status, device_info, static_files
+    )
     
     # IA Assistant Routes
     @app.route('/ia-assistant')
     async def ia_assistant_page(request):
         """Página del asistente de IA"""
         try:
-            # Usar Jinja2 para renderizar templates
-            from jinja2 import Environment, FileSystemLoader
-            from microdot import Response
-            
-            # Configurar entorno Jinja2
-            env = Environment(loader=FileSystemLoader('templates'))
-            template = env.get_template('ia_assistant.html')
-            
-            # Renderizar template con contexto
-            rendered_html = template.render()
-            
-            return Response(rendered_html, headers={'Content-Type': 'text/html; charset=utf-8'})
+            return render_static_page(request, 'ia_assistant.html')
             
         except Exception as e:
             return Response(f"<h1>Error</h1><p>{str(e)}</p>", headers={'Content-Type': 'text/html; charset=utf-8'})
@@ -4058,14 +4538,14 @@ def main():
         """API: Detectar hardware del dispositivo"""
         try:
             if not adb_manager.is_available():
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': 'ADB no disponible'
                 })
             
-            devices = adb_manager.get_devices()
+            devices = await adb_manager.get_devices()
             if not devices:
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': 'No hay dispositivos conectados'
                 })
@@ -4081,12 +4561,12 @@ def main():
             hardware_info = {}
             for key, cmd in commands.items():
                 try:
-                    result = subprocess.run(['adb', 'shell', cmd], capture_output=True, text=True, timeout=10)
+                    result = await adb_manager.run('shell', cmd, timeout=10)
                     hardware_info[key] = result.stdout.strip() if result.returncode == 0 else 'N/A'
                 except:
                     hardware_info[key] = 'N/A'
             
-            return json.dumps({
+            return json_response({
                 'success': True,
                 'hardware': hardware_info,
                 'recommendations': {
@@ -4096,7 +4576,7 @@ def main():
             })
             
         except Exception as e:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': f'Error detectando hardware: {str(e)}'
             })
@@ -4109,13 +4589,13 @@ def main():
             model_type = data.get('model', '').strip().lower()
             
             if model_type not in ['tinyllama', 'mobilenet']:
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': 'Modelo no válido. Debe ser tinyllama o mobilenet'
                 })
             
             if not adb_manager.is_available():
-                return json.dumps({
+                return json_response({
                     'success': False,
                     'error': 'ADB no disponible'
                 })
@@ -4128,9 +4608,9 @@ def main():
             ]
             
             for cmd in commands:
-                result = subprocess.run(['adb', 'shell', cmd], capture_output=True, text=True, timeout=15)
+                result = await adb_manager.run('shell', cmd, timeout=15)
                 if result.returncode != 0:
-                    return json.dumps({
+                    return json_response({
                         'success': False,
                         'error': f'Error creando directorios: {result.stderr}'
                     })
@@ -4141,10 +4621,10 @@ def main():
             else:
                 install_result = await install_mobilenet(ia_dir)
             
-            return json.dumps(install_result)
+            return json_response(install_result)
             
         except Exception as e:
-            return json.dumps({
+            return json_response({
                 'success': False,
                 'error': f'Error instalando modelo: {str(e)}'
             })
@@ -4156,7 +4636,7 @@ def main():
             packages = ["transformers", "torch", "onnx", "sentencepiece"]
             install_cmd = f"/home/phablet/.ubtool/venv/bin/pip install {' '.join(packages)}"
             
-            result = subprocess.run(['adb', 'shell', install_cmd], capture_output=True, text=True, timeout=300)
+            result = await adb_manager.run('shell', install_cmd, timeout=300)
             if result.returncode != 0:
                 return {
                     'success': False,
@@ -4214,7 +4694,7 @@ EOF
 python3 download_model.py
 """
             
-            result = subprocess.run(['adb', 'shell', model_script], capture_output=True, text=True, timeout=600)
+            result = await adb_manager.run('shell', model_script, timeout=600)
             
             if result.returncode == 0:
                 return {
@@ -4242,7 +4722,7 @@ python3 download_model.py
             packages = ["torch", "torchvision", "pillow", "numpy"]
             install_cmd = f"/home/phablet/.ubtool/venv/bin/pip install {' '.join(packages)}"
             
-            result = subprocess.run(['adb', 'shell', install_cmd], capture_output=True, text=True, timeout=300)
+            result = await adb_manager.run('shell', install_cmd, timeout=300)
             if result.returncode != 0:
                 return {
                     'success': False,
@@ -4325,7 +4805,7 @@ EOF
 python3 setup_model.py
 """
             
-            result = subprocess.run(['adb', 'shell', model_script], capture_output=True, text=True, timeout=300)
+            result = await adb_manager.run('shell', model_script, timeout=300)
             
             if result.returncode == 0:
                 return {
@@ -4346,14 +4826,39 @@ python3 setup_model.py
                 'error': f'Error instalando MobileNetV2: {str(e)}'
             }
     
+    async def serve():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(blocking_pool)
+        # systemd/docker stop with SIGTERM: leave the accept loop the same way
+        # Ctrl+C does so terminals and adb shells are reaped, not orphaned
+        try:
+            loop.add_signal_handler(signal.SIGTERM, app.shutdown)
+        except (NotImplementedError, AttributeError):
+            pass  # Windows event loops have no signal handlers
+        try:
+            await app.start_server(host=HOST, port=PORT, debug=SERVER_DEBUG)
+        finally:
+            # Reap open terminals while the loop and its executor still run
+            await terminal_manager.close_all_sessions_async()
+            # asyncio.run waits for the default executor on exit: drop the
+            # blocking calls still queued instead of draining them
+            # (cancel_futures is Python 3.9+)
+            if sys.version_info >= (3, 9):
+                blocking_pool.shutdown(wait=False, cancel_futures=True)
+    
     # Iniciar servidor
     try:
-        app.run(host=HOST, port=PORT, debug=DEBUG)
+        asyncio.run(serve())
     except KeyboardInterrupt:
-        print("\n👋 Deteniendo UBTool...")
+        logger.info("👋 Deteniendo UBTool...")
     except Exception as e:
-        print(f"❌ Error al iniciar servidor: {e}")
+        logger.error("❌ Error al iniciar servidor: %s", e)
         sys.exit(1)
+    finally:
+        adb_manager.shells.close_all()
+        blocking_pool.shutdown(wait=False)
+        # Flush queued log records before the process exits
+        log_listener.stop()
 
 if __name__ == '__main__':
     main()
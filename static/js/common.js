@@ -22,6 +22,33 @@ async function parseJSONResponse(response) {
     }
 }
 
+// Wait for a background install started by /api/devtools/create_env
+async function waitForInstallJob(jobId, intervalMs = 2000) {
+    while (true) {
+        const response = await fetch(`/api/devtools/install_status?job_id=${encodeURIComponent(jobId)}`);
+        const data = await parseJSONResponse(response);
+        if (!data.success) {
+            throw new Error(data.error || 'Instalación no encontrada');
+        }
+        if (data.state === 'done' || data.state === 'error') {
+            return data;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
+// Append a failed install job (message + tail of pip's output) to a status element
+function showInstallJobError(statusDiv, job, message) {
+    const title = document.createElement('p');
+    title.style.color = '#f44336';
+    title.textContent = message || '❌ Error instalando las dependencias del framework';
+    const output = document.createElement('pre');
+    output.style.cssText = 'max-height: 200px; overflow: auto; white-space: pre-wrap; font-size: 0.8rem;';
+    output.textContent = job.output || '';
+    statusDiv.appendChild(title);
+    statusDiv.appendChild(output);
+}
+
 // Sidebar functionality
 let sidebarTimeout;
 let isSidebarOpen = false;
@@ -455,6 +482,8 @@ function fmEntryClick(isDir, encodedName) {
 // Terminal Functions
 let terminalSessionId = null;
 let terminalInterval = null;
+let terminalSocket = null;
+let terminalOutputETag = null;
 
 function createRealTerminalModal() {
     const modal = document.createElement('div');
@@ -531,11 +560,12 @@ async function initializeTerminal() {
         
         if (data.success) {
             terminalSessionId = data.session_id;
+            terminalOutputETag = null;
             document.getElementById('device-status-terminal').textContent = 'Conectado al dispositivo';
             document.getElementById('session-id-terminal').textContent = data.session_id.substring(0, 12) + '...';
             
-            // Start polling for output
-            terminalInterval = setInterval(pollTerminalOutput, 500);
+            // Stream output (falls back to polling)
+            startTerminalStream();
             
             // Start with empty output
             const output = document.getElementById('terminal-output');
@@ -586,38 +616,81 @@ async function sendTerminalCommand() {
     output.scrollTop = output.scrollHeight;
 }
 
+function appendTerminalOutput(chunk) {
+    const output = document.getElementById('terminal-output');
+    if (!output || !chunk) return;
+
+    // Strip terminal control sequences (ANSI/OSC) that can show up as "0;user@host"
+    // OSC: ESC ] ... BEL or ESC \
+    chunk = chunk.replace(/\x1b\][\s\S]*?(?:\x07|\x1b\\)/g, '');
+    // CSI: ESC [ ... letter
+    chunk = chunk.replace(/\x1b\[[0-9;?]*[ -/]*[@-~]/g, '');
+    // Fallback: sometimes title text leaks without the ESC prefix
+    chunk = chunk.replace(/(^|\r?\n)0;[^\r\n]*?(?=(\r?\n|$))/g, '$1');
+
+    // Simplify prompt: user@host:/path$ -> user$
+    // Also handles root@host:/path# -> root#
+    chunk = chunk.replace(/([a-zA-Z0-9_-]+)@[^\s:]+:[^\r\n$#]*([\$#])/g, '$1$2');
+
+    output.textContent += chunk;
+    output.scrollTop = output.scrollHeight;
+}
+
+function startTerminalStream() {
+    if (!('WebSocket' in window)) {
+        terminalInterval = setInterval(pollTerminalOutput, 500);
+        return;
+    }
+
+    // Output is pushed over a WebSocket; polling is only the fallback
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = new WebSocket(`${protocol}//${window.location.host}/api/terminal/${terminalSessionId}/ws`);
+    terminalSocket = socket;
+
+    socket.onmessage = (event) => appendTerminalOutput(event.data);
+    socket.onclose = () => {
+        if (terminalSocket !== socket) return;
+        terminalSocket = null;
+        // Session ended or WebSocket unavailable: one more poll reports
+        // the session state and keeps the terminal working either way
+        if (terminalSessionId && !terminalInterval) {
+            terminalInterval = setInterval(pollTerminalOutput, 500);
+        }
+    };
+}
+
+function stopTerminalStream() {
+    if (terminalSocket) {
+        const socket = terminalSocket;
+        terminalSocket = null;
+        socket.close();
+    }
+    if (terminalInterval) {
+        clearInterval(terminalInterval);
+        terminalInterval = null;
+    }
+}
+
 async function pollTerminalOutput() {
     if (!terminalSessionId) return;
     
     try {
-        const response = await fetch(`/api/terminal/${terminalSessionId}/output`);
+        // Conditional poll: the server answers 304 when there is no new output
+        const headers = terminalOutputETag ? { 'If-None-Match': terminalOutputETag } : {};
+        const response = await fetch(`/api/terminal/${terminalSessionId}/output`, { headers });
+        if (response.status === 304) return;
+        terminalOutputETag = response.headers.get('ETag');
         const data = await parseJSONResponse(response);
         
         if (data.success && data.output) {
-            const output = document.getElementById('terminal-output');
-            let chunk = data.output;
-
-            // Strip terminal control sequences (ANSI/OSC) that can show up as "0;user@host"
-            // OSC: ESC ] ... BEL or ESC \
-            chunk = chunk.replace(/\x1b\][\s\S]*?(?:\x07|\x1b\\)/g, '');
-            // CSI: ESC [ ... letter
-            chunk = chunk.replace(/\x1b\[[0-9;?]*[ -/]*[@-~]/g, '');
-            // Fallback: sometimes title text leaks without the ESC prefix
-            chunk = chunk.replace(/(^|\r?\n)0;[^\r\n]*?(?=(\r?\n|$))/g, '$1');
-
-            // Simplify prompt: user@host:/path$ -> user$
-            // Also handles root@host:/path# -> root#
-            chunk = chunk.replace(/([a-zA-Z0-9_-]+)@[^\s:]+:[^\r\n$#]*([\$#])/g, '$1$2');
-
-            output.textContent += chunk;
-            output.scrollTop = output.scrollHeight;
-            
-            // Update status if session became inactive
-            if (!data.active) {
-                document.getElementById('device-status-terminal').textContent = 'Desconectado';
-                clearInterval(terminalInterval);
-                terminalInterval = null;
-            }
+            appendTerminalOutput(data.output);
+        }
+
+        // Update status if session became inactive
+        if (data.success && !data.active) {
+            document.getElementById('device-status-terminal').textContent = 'Desconectado';
+            clearInterval(terminalInterval);
+            terminalInterval = null;
         }
     } catch (error) {
         console.error('Error polling terminal:', error);
@@ -625,10 +698,7 @@ async function pollTerminalOutput() {
 }
 
 function closeTerminal() {
-    if (terminalInterval) {
-        clearInterval(terminalInterval);
-        terminalInterval = null;
-    }
+    stopTerminalStream();
     
     if (terminalSessionId) {
         // Close terminal session
@@ -956,6 +1026,18 @@ async function createWebApp(event) {
                 </div>
             `;
             
+            // The framework packages are installed in the background
+            if (data.install_job) {
+                submitBtn.textContent = '⏳ Instalando dependencias...';
+                const job = await waitForInstallJob(data.install_job);
+                if (job.state !== 'done') {
+                    showInstallJobError(statusDiv, job);
+                    submitBtn.disabled = false;
+                    submitBtn.textContent = '🚀 Crear WebApp';
+                    return;
+                }
+            }
+            
             // Reset form
             document.getElementById('webapp-form').reset();
             submitBtn.textContent = '✅ Creado Exitosamente';
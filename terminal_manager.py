@@ -7,27 +7,49 @@ Manages interactive shell sessions with ADB devices
 import re
 import asyncio
 import json
+import logging
 import subprocess
 import threading
 import time
 from typing import Dict, Optional, Callable
 import ptyprocess
 
+logger = logging.getLogger('ubtool.terminal')
+
 # ANSI escape code patterns
 ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+CONTROL_CHARS_PATTERN = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+MULTISPACE_PATTERN = re.compile(r' +')
+
+# Output kept per session while nobody drains it (characters)
+MAX_BUFFER_CHARS = 256 * 1024
 
 
 class TerminalSession:
     """Manages a single terminal session"""
     
+    # Many sessions can be alive at once and their attributes are hit on
+    # every poll: keep them in slots instead of a per-instance __dict__
+    __slots__ = (
+        'session_id', 'adb_path', 'device_id', 'created_at', 'process', 'active', 'callbacks',
+        'output_buffer', 'buffer_size', 'generation', '_buffer_lock'
+    )
+    
     def __init__(self, session_id: str, adb_path: str, device_id: str):
         self.session_id = session_id
         self.adb_path = adb_path
         self.device_id = device_id
+        self.created_at = time.time()
         self.process: Optional[ptyprocess.PtyProcessUnicode] = None
         self.active = False
         self.callbacks: Dict[str, Callable] = {}
         self.output_buffer = []
+        self.buffer_size = 0
+        # Bumped on every chunk of output; lets pollers detect "nothing new"
+        self.generation = 0
+        # Guards output_buffer and callbacks: the monitor thread writes,
+        # request handlers drain
+        self._buffer_lock = threading.Lock()
         
     def start(self):
         """Start the terminal session"""
@@ -42,7 +64,7 @@ class TerminalSession:
             
             return True
         except Exception as e:
-            print(f"Error starting terminal session: {e}")
+            logger.error("Error starting terminal session: %s", e)
             return False
     
     def _monitor_output(self):
@@ -77,7 +99,7 @@ class TerminalSession:
                 time.sleep(0.05)  # Slightly longer delay to prevent CPU spinning
                 
             except Exception as e:
-                print(f"Error monitoring output: {e}")
+                logger.error("Error monitoring output: %s", e)
                 break
         
         self.active = False
@@ -86,14 +108,31 @@ class TerminalSession:
         """Handle terminal output"""
         # Clean ANSI escape codes for better web display
         clean_output = self._clean_ansi_codes(output)
-        self.output_buffer.append(clean_output)
+        
+        # Subscribers (e.g. the WebSocket stream) consume output directly;
+        # the buffer only backs the polling endpoint when nobody listens
+        with self._buffer_lock:
+            self.generation += 1
+            callbacks = list(self.callbacks.values())
+            if not callbacks:
+                self._append_buffer(clean_output)
         
         # Notify callbacks
-        for callback in self.callbacks.values():
+        for callback in callbacks:
             try:
                 callback(self.session_id, clean_output)
             except Exception as e:
-                print(f"Error in callback: {e}")
+                logger.error("Error in callback: %s", e)
+    
+    def _append_buffer(self, text: str):
+        """Append output, dropping the oldest part beyond MAX_BUFFER_CHARS (lock held)"""
+        self.output_buffer.append(text)
+        self.buffer_size += len(text)
+        if self.buffer_size > MAX_BUFFER_CHARS:
+            # Nobody is draining (client gone?): keep only the tail
+            tail = ''.join(self.output_buffer)[-MAX_BUFFER_CHARS:]
+            self.output_buffer = [tail]
+            self.buffer_size = len(tail)
     
     def _clean_ansi_codes(self, text: str) -> str:
         """Remove ANSI escape codes from text"""
@@ -134,14 +173,14 @@ class TerminalSession:
             clean_text = clean_text.replace(seq, '')
         
         # Clean up any remaining control characters
-        clean_text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', clean_text)
+        clean_text = CONTROL_CHARS_PATTERN.sub('', clean_text)
         
         # Replace multiple spaces with single space (but preserve newlines)
         lines = clean_text.split('\n')
         cleaned_lines = []
         for line in lines:
             # Remove extra spaces but keep the structure
-            cleaned_line = re.sub(r' +', ' ', line.strip())
+            cleaned_line = MULTISPACE_PATTERN.sub(' ', line.strip())
             cleaned_lines.append(cleaned_line)
         
         return '\n'.join(cleaned_lines)
@@ -163,7 +202,7 @@ class TerminalSession:
                 
                 return True
             except Exception as e:
-                print(f"Error writing to terminal: {e}")
+                logger.error("Error writing to terminal: %s", e)
                 return False
         return False
     
@@ -174,26 +213,37 @@ class TerminalSession:
                 self.process.setwinsize(rows, cols)
                 return True
             except Exception as e:
-                print(f"Error resizing terminal: {e}")
+                logger.error("Error resizing terminal: %s", e)
                 return False
         return False
     
     def add_callback(self, callback_id: str, callback: Callable):
         """Add output callback"""
-        self.callbacks[callback_id] = callback
+        with self._buffer_lock:
+            self.callbacks[callback_id] = callback
     
     def remove_callback(self, callback_id: str):
         """Remove output callback"""
-        if callback_id in self.callbacks:
-            del self.callbacks[callback_id]
+        with self._buffer_lock:
+            self.callbacks.pop(callback_id, None)
     
     def get_buffer(self) -> str:
         """Get output buffer"""
-        return ''.join(self.output_buffer)
+        with self._buffer_lock:
+            return ''.join(self.output_buffer)
     
     def clear_buffer(self):
         """Clear output buffer"""
-        self.output_buffer.clear()
+        with self._buffer_lock:
+            self.output_buffer = []
+            self.buffer_size = 0
+    
+    def drain_buffer(self) -> str:
+        """Atomically take and clear the output buffer"""
+        with self._buffer_lock:
+            chunks, self.output_buffer = self.output_buffer, []
+            self.buffer_size = 0
+        return ''.join(chunks)
     
     def close(self):
         """Close terminal session"""
@@ -213,19 +263,21 @@ class TerminalSession:
 class TerminalManager:
     """Manages multiple terminal sessions"""
     
+    __slots__ = ('adb_manager', 'sessions', 'session_counter')
+    
     def __init__(self, adb_manager):
         self.adb_manager = adb_manager
         self.sessions: Dict[str, TerminalSession] = {}
         self.session_counter = 0
         
-    def create_session(self, device_id: str = None) -> Optional[str]:
+    async def create_session(self, device_id: str = None) -> Optional[str]:
         """Create a new terminal session"""
         if not self.adb_manager.is_available():
             return None
         
         # Get device if not specified
         if not device_id:
-            devices = self.adb_manager.get_devices()
+            devices = await self.adb_manager.get_devices()
             if not devices:
                 return None
             device_id = devices[0]['id']
@@ -269,6 +321,22 @@ class TerminalManager:
             if session_id in self.sessions:
                 del self.sessions[session_id]
     
+    async def close_session_async(self, session_id: str):
+        """Close terminal session without blocking the event loop"""
+        # Unlist it right away; terminate()/wait() on the PTY can take a
+        # while, so they run in the loop's executor
+        session = self.sessions.pop(session_id, None)
+        if session:
+            await asyncio.get_running_loop().run_in_executor(None, session.close)
+    
+    async def close_all_sessions_async(self):
+        """Close all terminal sessions concurrently"""
+        # Each close() blocks on its own PTY child: reap them side by side so
+        # shutdown waits for the slowest session rather than the sum of all
+        await asyncio.gather(*(
+            self.close_session_async(session_id) for session_id in list(self.sessions)
+        ))
+    
     def get_active_sessions(self) -> Dict[str, dict]:
         """Get list of active sessions"""
         active_sessions = {}
@@ -278,7 +346,7 @@ class TerminalManager:
                     'id': session_id,
                     'device_id': session.device_id,
                     'active': session.active,
-                    'buffer_length': len(session.output_buffer)
+                    'buffer_length': session.buffer_size
                 }
         return active_sessions
     